@@ -1,17 +1,35 @@
-from flask import Flask, request, session, redirect, url_for
+import hmac
+import time
+from flask import Flask, request, session, redirect, url_for, g, abort, send_file
 import config
 from controllers.create_repo import CreateRepoFactory
-from controllers.controllers import TeacherController, AddTeacherController, UpdateTeacherController, DeleteTeacherController
+from controllers.warmup import WarmUp
+from controllers.controllers import TeacherController, AddTeacherController, UpdateTeacherController, DeleteTeacherController, \
+    StatsController, ApiTeacherController
+from models.events import ChangeFeed, EventLog
+from models.querylog import QueryLog
+from models.metrics import REGISTRY
+from models import profiling
+from models.snils import Snils
 from views import views
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
-# Создаем контроллеры и представления
-repo = CreateRepoFactory.create_repo(config.DEFAULT_REPO_TYPE)
+# Поток событий изменения данных для кэшей, индексов и фоновых обработчиков
+change_feed = ChangeFeed(EventLog(config.EVENT_LOG_PATH) if config.EVENT_LOG_PATH else None)
+
+# Статистика и журнал медленных запросов к БД
+query_log = None
+if config.DB_SLOW_QUERY_SECONDS is not None:
+    query_log = QueryLog(config.DB_SLOW_QUERY_SECONDS, config.DB_SLOW_QUERY_LOG,
+                         config.DB_EXPLAIN_SLOW_QUERIES)
+
+# Создаем контроллеры и представления; данные загружаются при первом запросе
+repo = CreateRepoFactory.create_lazy(config.DEFAULT_REPO_TYPE, change_feed, query_log)
 
 teacher_controller = TeacherController(repo)
-teacher_view = views.TeacherListView()
+teacher_view = views.TeacherListView(config.INDEX_PAGE_CACHE_SIZE, config.INDEX_ROW_CACHE_SIZE)
 teacher_controller.attach(teacher_view)
 
 add_teacher_controller = AddTeacherController(repo)
@@ -26,15 +44,86 @@ delete_teacher_controller = DeleteTeacherController(repo)
 delete_teacher_view = views.DeleteTeacherView()
 delete_teacher_controller.attach(delete_teacher_view)
 
+api_teacher_controller = ApiTeacherController(repo)
+api_teacher_view = views.TeacherApiView()
+api_teacher_controller.attach(api_teacher_view)
+
+stats_controller = StatsController(repo)
+stats_view = views.StatsView()
+stats_controller.attach(stats_view)
+
+
+# Метрики запросов и кэшей
+REGISTRY.enabled = config.METRICS_ENABLED
+REQUEST_SECONDS = REGISTRY.histogram('teachers_http_request_duration_seconds',
+                                     "Длительность обработки запросов по маршрутам",
+                                     ('method', 'route'))
+REQUESTS = REGISTRY.counter('teachers_http_requests_total',
+                            "Число запросов по маршрутам и кодам ответа",
+                            ('method', 'route', 'status'))
+
+
+def cache_metrics():
+    stats = teacher_view.cache_stats()
+    snils = Snils.cache_info()
+    stats['snils'] = (snils.hits, snils.misses)
+    for name, help_text, index in (('teachers_cache_hits_total', "Попадания в кэш", 0),
+                                   ('teachers_cache_misses_total', "Промахи кэша", 1)):
+        yield name, 'counter', help_text, [({'cache': cache}, values[index])
+                                           for cache, values in stats.items()]
+
+
+REGISTRY.register_collector(cache_metrics)
+
+# Профили запросов хранятся в ограниченном кольце на диске
+profile_store = None
+if config.PROFILING_ENABLED or config.PROFILE_SECRET:
+    profile_store = profiling.ProfileStore(config.PROFILE_DIR, config.PROFILE_RING_SIZE)
+
+
+def should_profile() -> bool:
+    """Проверяет, нужно ли профилировать текущий запрос."""
+    if profile_store is None or request.path.startswith(('/admin/', '/metrics')):
+        return False
+    return config.PROFILING_ENABLED or profiling.verify(
+        config.PROFILE_SECRET, request.path, request.args, request.headers.get('X-Profile'))
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    if should_profile():
+        profiling.start(f"{request.method} {request.full_path}")
+
+
+@app.after_request
+def record_request(response):
+    start = g.pop('request_start', None)
+    if REGISTRY.enabled and start is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_SECONDS.labels(request.method, route).observe(time.perf_counter() - start)
+        REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+
+    profile = profiling.finish()
+    if profile is not None:
+        response.headers['X-Profile-Id'] = profile_store.save(
+            profile, method=request.method, path=request.full_path, status=response.status_code)
+    return response
+
+
+@app.teardown_request
+def drop_profile(exc):
+    # После необработанного исключения after_request не вызывается
+    profiling.finish()
+
 
 def get_current_repo():
     repo_type = session.get('repo_type', config.DEFAULT_REPO_TYPE)
-    return CreateRepoFactory.create_repo(repo_type)
+    return CreateRepoFactory.create_repo(repo_type, change_feed, query_log)
 
 
-@app.route('/')
-def index():
-    # Получаем параметры фильтрации из GET-запроса
+def get_filter_params():
+    """Возвращает параметры фильтрации из GET-запроса"""
     filter_params = {}
     
     # Простые текстовые фильтры
@@ -54,19 +143,151 @@ def index():
         filter_params['min_experience'] = request.args.get('min_experience')
     if request.args.get('max_experience'):
         filter_params['max_experience'] = request.args.get('max_experience')
-    
-    # Получаем параметры сортировки
+    return filter_params
+
+
+def get_sort_params():
+    """Возвращает параметры сортировки из GET-запроса"""
     sort_params = {}
     if request.args.get('sort'):
         sort_params['field'] = request.args.get('sort')
     if request.args.get('order') == 'desc':
         sort_params['reverse'] = True
-    
+    return sort_params
+
+
+# Прогрев: данные, шаблоны и главная страница готовятся до первого запроса
+def warm_index_page():
+    # Страница для посетителя без параметров и выбранного хранилища
+    with app.test_request_context('/'):
+        teacher_view.render(teacher_controller.load_teachers())
+
+
+warm_up = WarmUp()
+warm_up.add_step('repository', repo.load)
+warm_up.add_step('templates', lambda: [app.jinja_env.get_template(name)
+                                       for name in app.jinja_env.list_templates()])
+warm_up.add_step('index_page', warm_index_page)
+if config.WARM_UP_ON_START:
+    warm_up.start()
+
+
+@app.route('/healthz')
+def healthz():
+    return views.json_response({"status": "ok"})
+
+
+@app.route('/readyz')
+def readyz():
+    # Без прогрева при запуске данные загружаются первым запросом
+    if not config.WARM_UP_ON_START or warm_up.ready:
+        return views.json_response({"status": "ready", **warm_up.status()})
+    return views.json_response({"status": "not ready", **warm_up.status()}, 503)
+
+
+@app.route('/')
+def index():
+    # Неизменившуюся страницу отдаем из кэша или ответом 304
+    repository = teacher_controller.get_repo()
+    with profiling.stage('page_cache'):
+        cached = teacher_view.cached_response(*repository.version())
+    if cached is not None:
+        return cached
+
+    with profiling.stage('parse_params'):
+        filter_params = get_filter_params()
+        sort_params = get_sort_params()
+
     # Загружаем преподавателей с фильтрацией и сортировкой
-    teacher_controller.load_teachers(filter_params, sort_params)
-    
-    # Передаем параметры в шаблон
-    return teacher_view.render()
+    data = teacher_controller.load_teachers(filter_params, sort_params)
+
+    # Данные запроса передаются представлению напрямую: общее представление
+    # могут одновременно обновлять другие запросы и прогрев
+    return teacher_view.render(data)
+
+
+@app.route('/api/teachers')
+def api_teachers():
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', config.ITEMS_PER_PAGE, type=int)
+    if page < 1 or not 1 <= per_page <= config.API_MAX_PER_PAGE:
+        return views.json_response({"error": "Недопустимые параметры page или per_page"}, 400)
+
+    try:
+        with profiling.stage('parse_params'):
+            fields = views.api_fields(request.args.get('fields'))
+            filter_params = get_filter_params()
+            sort_params = get_sort_params()
+    except ValueError as e:
+        return views.json_response({"error": str(e)}, 400)
+
+    api_teacher_controller.load_teachers(filter_params, sort_params, page, per_page, fields)
+    return api_teacher_view.render_list()
+
+
+@app.route('/api/teachers/<int:teacher_id>')
+def api_teacher(teacher_id):
+    try:
+        fields = views.api_fields(request.args.get('fields'))
+    except ValueError as e:
+        return views.json_response({"error": str(e)}, 400)
+
+    api_teacher_controller.get_teacher(teacher_id, fields)
+    return api_teacher_view.render_teacher()
+
+
+@app.route('/metrics')
+def metrics():
+    if not REGISTRY.enabled:
+        abort(404)
+    return REGISTRY.expose(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+
+def require_admin():
+    """Пропускает только запросы с верным X-Admin-Token; без ключа маршруты скрыты."""
+    token = request.headers.get('X-Admin-Token', '')
+    if not config.PROFILE_SECRET or \
+            not hmac.compare_digest(token.encode('utf-8'), config.PROFILE_SECRET.encode('utf-8')):
+        abort(404)
+
+
+@app.route('/admin/profiles')
+def admin_profiles():
+    require_admin()
+    return views.json_response({"profiles": profile_store.list()})
+
+
+@app.route('/admin/profiles/<profile_id>')
+def admin_profile(profile_id):
+    require_admin()
+    if profile_id.endswith('.prof'):
+        path = profile_store.path(profile_id[:-5])
+        if path is None:
+            abort(404)
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                         download_name=profile_id)
+    meta = profile_store.get(profile_id, top=request.args.get('top', 30, type=int))
+    if meta is None:
+        abort(404)
+    return views.json_response(meta)
+
+
+@app.route('/admin/queries')
+def admin_queries():
+    require_admin()
+    if query_log is None:
+        abort(404)
+    return views.json_response({
+        "threshold_sec": query_log.threshold,
+        "statements": query_log.stats(),
+        "slow": [record._asdict() for record in query_log.slow_queries()]
+    })
+
+
+@app.route('/stats')
+def stats():
+    stats_controller.load_stats()
+    return stats_view.render()
 
 
 @app.route('/change_repo', methods=['POST'])
@@ -74,11 +295,16 @@ def change_repo():
     repo_type = request.form.get('repo_type')
     if repo_type in config.REPO_TYPES:
         session['repo_type'] = repo_type
-        new_repo = CreateRepoFactory.create_repo(repo_type)
+        # Новый репозиторий читает файл, поэтому отложенные изменения сохраняются
+        # до него, а отложенное сохранение старого репозитория останавливается
+        teacher_controller.get_repo().close()
+        new_repo = CreateRepoFactory.create_repo(repo_type, change_feed, query_log)
         teacher_controller.set_repo(new_repo)
         add_teacher_controller.set_repo(new_repo)
         update_teacher_controller.set_repo(new_repo)
         delete_teacher_controller.set_repo(new_repo)
+        api_teacher_controller.set_repo(new_repo)
+        stats_controller.set_repo(new_repo)
     return redirect(url_for('index'))
 
 
@@ -149,6 +375,17 @@ def update_teacher(teacher_id):
         return update_teacher_view.render()
 
 
+@app.route('/delete/', methods=['POST'])
+def delete_teachers():
+    teacher_ids = [int(teacher_id) for teacher_id in request.form.getlist('teacher_ids')
+                   if teacher_id.isdigit()]
+
+    delete_teacher_controller.delete_teachers(teacher_ids)
+
+    teacher_controller.load_teachers()
+    return redirect(url_for('index'))
+
+
 @app.route('/<int:teacher_id>/delete', methods=['POST'])
 def delete_teacher(teacher_id):
     delete_teacher_controller.delete_teacher(teacher_id)
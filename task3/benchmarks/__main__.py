@@ -0,0 +1,67 @@
+"""Запуск набора бенчмарков с выводом результатов в JSON.
+
+    cd task3
+    python -m benchmarks --size 1k > before.json
+    python -m benchmarks --size 1k --suite repositories --format json > after.json
+    python -m benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks import bench_models, bench_repositories, bench_routes, bench_startup, \
+    bench_persistence, bench_codecs, bench_shards
+from benchmarks.datagen import parse_size
+
+SUITES = {
+    'models': lambda rows, args: bench_models.run(rows),
+    'repositories': lambda rows, args: bench_repositories.run(rows, args.format),
+    'routes': lambda rows, args: bench_routes.run(rows),
+    'startup': lambda rows, args: bench_startup.run(rows),
+    'persistence': lambda rows, args: bench_persistence.run(rows, args.format),
+    'codecs': lambda rows, args: bench_codecs.run(rows, args.format),
+    'shards': lambda rows, args: bench_shards.run(rows),
+}
+
+
+def _git_commit() -> str | None:
+    """Возвращает текущий коммит для сопоставления результатов."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарки репозиториев, разбора и маршрутов")
+    parser.add_argument('--size', default='1k', help="1k, 100k, 1m или число записей")
+    parser.add_argument('--suite', action='append', choices=SUITES,
+                        help="набор бенчмарков (по умолчанию все)")
+    parser.add_argument('--format', action='append', choices=bench_repositories.REPOSITORIES,
+                        help="формат файлового репозитория (по умолчанию все)")
+    args = parser.parse_args(argv)
+    args.format = args.format or tuple(bench_repositories.REPOSITORIES)
+    rows = parse_size(args.size)
+
+    results = []
+    for suite in args.suite or SUITES:
+        print(f"Выполняется {suite} ({rows} записей)...", file=sys.stderr)
+        results.extend(SUITES[suite](rows, args))
+
+    json.dump({
+        'commit': _git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'rows': rows,
+        'results': results,
+    }, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""Бенчмарк кодеков файловых хранилищ: загрузка и сохранение по форматам и кодекам."""
+import os
+import tempfile
+from typing import List
+
+from benchmarks.bench_repositories import REPOSITORIES
+from benchmarks.harness import measure
+from models.codecs import available_codecs
+
+# Варианты записи: (имя, параметры репозитория)
+_VARIANTS = {
+    'json': lambda codec: [(codec, {'codec': codec}),
+                           (f"{codec}_compact", {'codec': codec, 'compact': True})],
+    'yaml': lambda codec: [(codec, {'codec': codec})],
+}
+
+
+def run(rows: int, formats=tuple(REPOSITORIES)) -> List[dict]:
+    """Замеряет load_from_file и save_to_file для каждого доступного кодека."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            repo_class, write = REPOSITORIES[fmt]
+            for codec in available_codecs(fmt):
+                for variant, params in _VARIANTS[fmt](codec):
+                    filename = os.path.join(directory, f"teachers_{variant}.{fmt}")
+                    write(filename, rows)
+                    repo = repo_class(filename, fsync=False, **params)
+                    # Файл перезаписывается в формате варианта (например, без отступов)
+                    repo.save_to_file()
+                    prefix = f"codec.{fmt}.{variant}"
+                    results.append(measure(f"{prefix}.load", repo._load_from_file,
+                                           number=1, repeat=3, rows=rows,
+                                           file_bytes=os.path.getsize(filename)))
+                    results.append(measure(f"{prefix}.save", repo.save_to_file,
+                                           number=1, repeat=3, rows=rows))
+    return results
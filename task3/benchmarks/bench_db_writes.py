@@ -0,0 +1,93 @@
+"""Бенчмарк операций записи TeacherRepDB (записей в секунду).
+
+Требуется локальный PostgreSQL с параметрами подключения из config.py
+и отдельной базой для бенчмарков: таблица teachers в ней очищается перед
+запуском и после него. Имя базы задается явно через --database, должно
+содержать «bench» и не может совпадать с рабочей базой config.DB_NAME.
+Для сравнения «до» и «после» запустите скрипт на нужных коммитах и
+сравните полученный JSON:
+
+    cd task3
+    createdb teachers_bench
+    python -m benchmarks.bench_db_writes --database teachers_bench --rows 2000 > after.json
+"""
+import argparse
+import json
+import sys
+import time
+
+import config
+from models.repositories import TeacherRepDB
+from benchmarks.datagen import make_teacher_data
+
+# Смещение номеров СНИЛС относительно наборов из datagen
+_SNILS_OFFSET = 5_000_000
+
+
+def check_bench_database(database: str):
+    """Проверяет, что база предназначена для бенчмарков, а не рабочая."""
+    if database == config.DB_NAME or 'bench' not in database:
+        raise ValueError(f"База {database} не похожа на базу для бенчмарков: таблица "
+                         f"teachers будет очищена. Укажите отдельную базу с «bench» в имени")
+
+
+def _truncate(repo: TeacherRepDB):
+    """Очищает таблицу преподавателей."""
+    with repo._get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("TRUNCATE teachers RESTART IDENTITY")
+        conn.commit()
+
+
+def bench_writes(repo: TeacherRepDB, rows: int) -> dict:
+    """Замеряет add_teacher, update_teacher и конфликт по СНИЛС."""
+    payloads = [make_teacher_data(_SNILS_OFFSET + i) for i in range(rows)]
+
+    start = time.perf_counter()
+    ids = [repo.add_teacher(data).teacher_id for data in payloads]
+    add_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for teacher_id, data in zip(ids, payloads):
+        data['experience_years'] += 1
+        repo.update_teacher(teacher_id, data)
+    update_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for data in payloads:
+        try:
+            repo.add_teacher(data)
+        except ValueError:
+            pass
+    conflict_time = time.perf_counter() - start
+
+    return {
+        'rows': rows,
+        'add_per_sec': rows / add_time,
+        'update_per_sec': rows / update_time,
+        'duplicate_add_per_sec': rows / conflict_time,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--database', required=True,
+                        help="отдельная база для бенчмарков (таблица teachers очищается)")
+    args = parser.parse_args(argv)
+    try:
+        check_bench_database(args.database)
+    except ValueError as e:
+        parser.error(str(e))
+
+    repo = TeacherRepDB(config.DB_HOST, args.database, config.DB_USER,
+                        config.DB_PASSWORD, config.DB_PORT)
+    _truncate(repo)
+    result = bench_writes(repo, args.rows)
+    _truncate(repo)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Микробенчмарки создания и разбора преподавателей."""
+from typing import List
+
+from models.teacher import Teacher
+from benchmarks.datagen import generate_teachers, to_string, to_json, to_xml
+from benchmarks.harness import measure
+
+# Число разных записей, по кругу передаваемых в конструктор
+_SAMPLE = 1000
+
+
+def run(rows: int) -> List[dict]:
+    """Замеряет конструктор Teacher и все пути _parse_* на одной записи."""
+    records = list(generate_teachers(min(rows, _SAMPLE)))
+    strings = [to_string(data) for data in records]
+    jsons = [to_json(data) for data in records]
+    xmls = [to_xml(data) for data in records]
+
+    def cycle(items):
+        index = 0
+
+        def next_item():
+            nonlocal index
+            index = (index + 1) % len(items)
+            return items[index]
+        return next_item
+
+    next_record, next_string = cycle(records), cycle(strings)
+    next_json, next_xml = cycle(jsons), cycle(xmls)
+
+    return [
+        measure('teacher.init_kwargs', lambda: Teacher(**next_record())),
+        measure('teacher.init_string', lambda: Teacher(next_string())),
+        measure('teacher.init_json', lambda: Teacher(next_json())),
+        measure('teacher.init_xml', lambda: Teacher(next_xml())),
+        measure('teacher.parse_string', lambda: Teacher._parse_string(next_string())),
+        measure('teacher.parse_json', lambda: Teacher._parse_json(next_json())),
+        measure('teacher.parse_xml', lambda: Teacher._parse_xml(next_xml())),
+    ]
@@ -0,0 +1,89 @@
+"""Бенчмарк задержки Subject.update с медленным наблюдателем.
+
+Сравнивает время уведомления в вызывающем потоке при синхронной и
+асинхронной доставке. В режиме async задержка уведомления не должна
+зависеть от --delay: при переполнении очереди в режиме DROP update()
+не ждет наблюдателя, и если самое долгое уведомление превышает
+--budget-ms (по умолчанию половина --delay), скрипт завершается с кодом 1:
+
+    cd task3
+    python -m benchmarks.bench_observers --delay 0.01 --updates 100
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+
+from controllers.subject import Subject, Observer, SYNC, ASYNC, BLOCK, DROP
+
+
+class _SlowObserver(Observer):
+    """Наблюдатель, обрабатывающий каждое уведомление delay секунд."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+
+    def update(self, data):
+        time.sleep(self.delay)
+        self.received += 1
+
+
+class _Source(Subject):
+    pass
+
+
+def bench_mode(mode: str, updates: int, delay: float, max_queue: int | None = None,
+               overflow: str = BLOCK) -> dict:
+    """Замеряет задержку update() и время доставки всех уведомлений."""
+    subject = _Source()
+    observer = _SlowObserver(delay)
+    subject.attach(observer, mode=mode, max_queue=max_queue or updates, overflow=overflow)
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(updates):
+        begin = time.perf_counter()
+        subject.update(i)
+        latencies.append(time.perf_counter() - begin)
+    subject.flush()
+    total = time.perf_counter() - start
+    dropped = subject.dropped(observer)
+    subject.close()
+
+    return {
+        'mode': mode if overflow == BLOCK else f"{mode}_{overflow}",
+        'updates': updates,
+        'delivered': observer.received,
+        'dropped': dropped,
+        'update_p50_ms': statistics.median(latencies) * 1000,
+        'update_max_ms': max(latencies) * 1000,
+        'total_sec': total,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--updates', type=int, default=100)
+    parser.add_argument('--delay', type=float, default=0.01)
+    parser.add_argument('--budget-ms', type=float,
+                        help="допустимая задержка update() в режиме DROP, мс")
+    args = parser.parse_args(argv)
+    budget_ms = args.budget_ms if args.budget_ms is not None else args.delay * 1000 / 2
+
+    result = [bench_mode(mode, args.updates, args.delay) for mode in (SYNC, ASYNC)]
+    # Очередь на одно уведомление переполняется сразу: update() не должен ждать
+    drop = bench_mode(ASYNC, args.updates, args.delay, max_queue=1, overflow=DROP)
+    result.append(drop)
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+    if drop['update_max_ms'] > budget_ms:
+        print(f"update() в режиме DROP занял {drop['update_max_ms']:.2f} мс, "
+              f"бюджет {budget_ms:.2f} мс", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""Бенчмарк пропускной способности правок: сохранение при каждом изменении и отложенное."""
+import os
+import random
+import tempfile
+from typing import List
+
+from benchmarks.bench_repositories import REPOSITORIES
+from benchmarks.datagen import make_teacher_data
+from benchmarks.harness import measure
+
+# Число правок в одной серии и параметры отложенного сохранения
+EDITS = 50
+SAVE_DELAY = 0.2
+SAVE_MAX_PENDING = 100
+
+
+def _bench_edits(fmt: str, rows: int, directory: str, scheduled: bool) -> dict:
+    """Замеряет серию из EDITS правок с сохранением, включая итоговый flush."""
+    repo_class, write = REPOSITORIES[fmt]
+    filename = os.path.join(directory, f"teachers_{'scheduled' if scheduled else 'sync'}.{fmt}")
+    write(filename, rows)
+    repo = repo_class(filename)
+    if scheduled:
+        repo.schedule_saves(SAVE_DELAY, SAVE_MAX_PENDING)
+
+    rnd = random.Random(0)
+    ids = [rnd.randint(1, rows) for _ in range(EDITS)]
+
+    def edit_series():
+        for index, teacher_id in enumerate(ids):
+            data = make_teacher_data(index, rnd)
+            del data['snils']
+            repo.update_teacher(teacher_id, data)
+            repo.persist()
+        repo.flush()
+
+    mode = 'scheduled' if scheduled else 'sync'
+    try:
+        result = measure(f"persistence.{fmt}.edits_{mode}", edit_series, number=1, repeat=3,
+                         rows=rows, edits=EDITS)
+    finally:
+        repo.close()
+    result['edits_per_sec'] = EDITS / result['best_sec']
+    return result
+
+
+def run(rows: int, formats=tuple(REPOSITORIES)) -> List[dict]:
+    """Сравнивает сохранение при каждой правке с отложенным для каждого формата."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            for scheduled in (False, True):
+                results.append(_bench_edits(fmt, rows, directory, scheduled))
+    return results
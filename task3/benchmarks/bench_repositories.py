@@ -0,0 +1,70 @@
+"""Бенчмарки файловых репозиториев: загрузка, сохранение, поиск и выборки."""
+import os
+import random
+import tempfile
+from typing import List
+
+from models.repositories import TeacherRepJson, TeacherRepYaml, FilterDecorator, SortDecorator
+from benchmarks.datagen import write_json, write_yaml, make_snils
+from benchmarks.harness import measure
+
+REPOSITORIES = {
+    'json': (TeacherRepJson, write_json),
+    'yaml': (TeacherRepYaml, write_yaml),
+}
+
+PAGE_SIZE = 10
+
+
+def _bench_repository(fmt: str, rows: int, directory: str) -> List[dict]:
+    """Замеряет операции одного репозитория на наборе из rows записей."""
+    repo_class, write = REPOSITORIES[fmt]
+    filename = os.path.join(directory, f"teachers.{fmt}")
+    write(filename, rows)
+    repo = repo_class(filename)
+
+    rnd = random.Random(0)
+    ids = [rnd.randint(1, rows) for _ in range(1000)]
+    snils = [make_snils(teacher_id - 1) for teacher_id in ids]
+    position = 0
+
+    def next_index():
+        nonlocal position
+        position = (position + 1) % len(ids)
+        return position
+
+    def experienced(teacher):
+        return teacher.experience_years >= 20
+
+    by_name = SortDecorator(repo, lambda teacher: teacher.last_name)
+    filtered = FilterDecorator(repo, experienced)
+    filtered_sorted = SortDecorator(filtered, lambda teacher: teacher.experience_years, reverse=True)
+    last_page = max(1, rows // PAGE_SIZE)
+
+    prefix = f"repository.{fmt}"
+    # Загрузка и сохранение медленные, поэтому замеряются по одному разу
+    return [
+        measure(f"{prefix}.load_from_file", repo._load_from_file, number=1, repeat=3, rows=rows),
+        measure(f"{prefix}.save_to_file", repo.save_to_file, number=1, repeat=3, rows=rows),
+        measure(f"{prefix}.get_by_id", lambda: repo.get_by_id(ids[next_index()]), rows=rows),
+        measure(f"{prefix}.get_by_snils", lambda: repo.get_by_snils(snils[next_index()]), rows=rows),
+        measure(f"{prefix}.page_first", lambda: repo.get_k_n_short_list(PAGE_SIZE, 1), rows=rows),
+        measure(f"{prefix}.page_last", lambda: repo.get_k_n_short_list(PAGE_SIZE, last_page), rows=rows),
+        measure(f"{prefix}.filter_count", filtered.get_count, number=1, rows=rows),
+        measure(f"{prefix}.sort_page", lambda: by_name.get_k_n_short_list(PAGE_SIZE, 1),
+                number=1, rows=rows),
+        measure(f"{prefix}.filter_sort_page", lambda: filtered_sorted.get_k_n_short_list(PAGE_SIZE, 1),
+                number=1, rows=rows),
+        measure(f"{prefix}.rows_page_projection",
+                lambda: filtered_sorted.get_rows_page(PAGE_SIZE, 1, ('teacher_id', 'experience_years')),
+                number=1, rows=rows),
+    ]
+
+
+def run(rows: int, formats=tuple(REPOSITORIES)) -> List[dict]:
+    """Замеряет репозитории указанных форматов."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for fmt in formats:
+            results.extend(_bench_repository(fmt, rows, directory))
+    return results
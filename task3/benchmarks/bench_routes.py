@@ -0,0 +1,70 @@
+"""Бенчмарки маршрутов Flask через тестовый клиент."""
+import importlib
+import os
+import tempfile
+from itertools import count
+from typing import List
+
+import config
+from benchmarks.datagen import write_json, make_teacher_data
+from benchmarks.harness import measure
+
+# Смещение номеров СНИЛС для добавляемых записей, чтобы не пересекаться с набором
+_SNILS_OFFSET = 5_000_000
+
+
+def run(rows: int) -> List[dict]:
+    """Замеряет /, /add/ и /<id>/ на JSON-хранилище из rows записей."""
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "teachers.json")
+        write_json(filename, rows)
+        # Фабрика репозиториев читает настройки при импорте, поэтому пути
+        # подменяются до него
+        config.JSON_FILE_PATH = filename
+        config.DEFAULT_REPO_TYPE = 'json'
+        config.EVENT_LOG_PATH = None
+        app_module = importlib.import_module('app')
+        # Прогрев идет в фоне и не должен пересекаться с замерами
+        app_module.warm_up.wait()
+        client = app_module.app.test_client()
+        view = app_module.teacher_view
+
+        def clear_cache():
+            view._pages.clear()
+            view._rows.clear()
+
+        def get(url, **kwargs):
+            response = client.get(url, **kwargs)
+            assert response.status_code in (200, 304), (url, response.status_code)
+            return response
+
+        etag = get('/').headers.get('ETag')
+        snils_numbers = count(_SNILS_OFFSET)
+
+        def add_teacher():
+            data = make_teacher_data(next(snils_numbers))
+            data['patronymic'] = data['patronymic'] or ''
+            data['academic_degree'] = data['academic_degree'] or ''
+            data['administrative_position'] = data['administrative_position'] or ''
+            response = client.post('/add/', data=data)
+            assert response.status_code == 302, response.status_code
+
+        teacher_id = max(1, rows // 2)
+        try:
+            results = [
+                measure('route.index_cold', lambda: get('/'), setup=clear_cache, number=1, rows=rows),
+                measure('route.index_rows_cached', lambda: (view._pages.clear(), get('/')), rows=rows),
+                measure('route.index_page_cached', lambda: get('/'), rows=rows),
+                measure('route.index_not_modified', lambda: get('/', headers={'If-None-Match': etag}),
+                        rows=rows),
+                measure('route.index_filter_sort_cold',
+                        lambda: get('/?min_experience=20&sort=last_name&order=desc'),
+                        setup=clear_cache, number=1, rows=rows),
+                measure('route.add_form', lambda: get('/add/'), rows=rows),
+                measure('route.update_form', lambda: get(f'/{teacher_id}/'), rows=rows),
+                measure('route.add_teacher', add_teacher, number=1, rows=rows),
+            ]
+        finally:
+            # Отложенное сохранение не должно писать во временный каталог после его удаления
+            app_module.teacher_controller.get_repo().close()
+    return results
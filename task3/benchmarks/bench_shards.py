@@ -0,0 +1,39 @@
+"""Бенчмарк шардированного JSON хранилища: загрузка и сохранение после одной правки."""
+import os
+import tempfile
+from typing import List
+
+from models.repositories import TeacherRepJson, TeacherRepJsonSharded
+from benchmarks.datagen import write_json, make_teacher_data
+from benchmarks.harness import measure
+
+SHARDS = 8
+
+
+def run(rows: int) -> List[dict]:
+    """Сравнивает один файл и SHARDS шардов на наборе из rows записей."""
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "teachers.json")
+        write_json(filename, rows)
+        single = TeacherRepJson(filename, fsync=False)
+        repos = {'single': single}
+        for workers in (1, None):
+            name = f"sharded_{SHARDS}_{'serial' if workers == 1 else 'parallel'}"
+            repos[name] = TeacherRepJsonSharded(os.path.join(directory, name), shards=SHARDS,
+                                                fsync=False, workers=workers,
+                                                legacy_filename=filename)
+
+        for name, repo in repos.items():
+            def edit_and_save(repo=repo):
+                teacher = repo.get_by_id(1)
+                data = make_teacher_data(1)
+                data['snils'] = teacher.snils
+                repo.update_teacher(1, data)
+                repo.save_to_file()
+
+            results.append(measure(f"shards.{name}.load", repo._load_from_file,
+                                   number=1, repeat=3, rows=rows))
+            results.append(measure(f"shards.{name}.edit_save", edit_and_save,
+                                   number=1, repeat=3, rows=rows))
+    return results
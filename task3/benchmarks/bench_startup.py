@@ -0,0 +1,86 @@
+"""Бенчмарк холодного запуска: время импорта app по данным python -X importtime.
+
+    cd task3
+    python -m benchmarks.bench_startup --budget-ms 300
+
+С --budget-ms завершается с кодом 1, если лучшее время импорта превышает
+бюджет, поэтому подходит для проверки в CI.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import List
+
+_TASK_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые не должны загружаться при импорте приложения
+LAZY_MODULES = ('yaml', 'psycopg2', 'xml.etree.ElementTree')
+
+
+def _import_once(module: str) -> tuple[int, dict]:
+    """Импортирует module в новом интерпретаторе.
+
+    Возвращает суммарное время импорта в микросекундах и собственное
+    время каждого модуля.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=_TASK_DIR, capture_output=True, text=True, check=True)
+    total, modules = 0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        name = name.strip()
+        modules[name] = int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total, modules
+
+
+def run(rows: int = 0, repeat: int = 5, module: str = 'app', top: int = 10) -> List[dict]:
+    """Замеряет время импорта module; rows не используется (данные не загружаются)."""
+    samples, modules = [], {}
+    for _ in range(repeat):
+        total, modules = _import_once(module)
+        samples.append(total / 1e6)
+    best = min(samples)
+    return [{
+        'name': f'startup.import_{module}',
+        'number': 1,
+        'repeat': repeat,
+        'best_sec': best,
+        'mean_sec': statistics.mean(samples),
+        'stdev_sec': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops_per_sec': 1 / best if best else float('inf'),
+        'eager_modules': [name for name in LAZY_MODULES if name in modules],
+        'slowest_modules': sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top],
+    }]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Время импорта приложения (холодный запуск)")
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, help="допустимое время импорта, мс")
+    args = parser.parse_args(argv)
+
+    result = run(repeat=args.repeat, module=args.module)[0]
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+
+    failed = False
+    if result['eager_modules']:
+        print(f"При импорте загружены модули: {', '.join(result['eager_modules'])}", file=sys.stderr)
+        failed = True
+    if args.budget_ms is not None and result['best_sec'] * 1000 > args.budget_ms:
+        print(f"Импорт {args.module}: {result['best_sec'] * 1000:.1f} мс, "
+              f"бюджет {args.budget_ms:.1f} мс", file=sys.stderr)
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+"""Сравнение двух JSON-файлов с результатами бенчмарков.
+
+    python -m benchmarks.compare before.json after.json --threshold 0.1
+
+Код возврата 1, если какой-либо бенчмарк замедлился больше порога.
+"""
+import argparse
+import json
+import sys
+
+
+def _load(filename: str) -> dict:
+    with open(filename, 'r', encoding='utf-8') as file:
+        return {result['name']: result for result in json.load(file)['results']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сравнение результатов бенчмарков")
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="допустимое относительное замедление (0.1 = 10%%)")
+    args = parser.parse_args(argv)
+
+    before, after = _load(args.before), _load(args.after)
+    regressions = 0
+    for name in sorted(before.keys() & after.keys()):
+        old, new = before[name]['best_sec'], after[name]['best_sec']
+        change = (new - old) / old if old else 0.0
+        marker = ""
+        if change > args.threshold:
+            marker = "  ЗАМЕДЛЕНИЕ"
+            regressions += 1
+        print(f"{name:45} {old * 1e6:12.1f} мкс -> {new * 1e6:12.1f} мкс  {change:+7.1%}{marker}")
+    for name in sorted(before.keys() ^ after.keys()):
+        print(f"{name:45} есть только в {'before' if name in before else 'after'}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
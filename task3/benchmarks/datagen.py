@@ -0,0 +1,89 @@
+"""Генератор синтетических данных о преподавателях для бенчмарков."""
+import json
+import random
+from typing import Iterator
+import yaml
+
+LAST_NAMES = ['Иванов', 'Петров', 'Сидоров', 'Смирнов', 'Кузнецов', 'Попов', 'Васильев', 'Соколов']
+FIRST_NAMES = ['Иван', 'Петр', 'Алексей', 'Сергей', 'Дмитрий', 'Андрей', 'Михаил', 'Николай']
+PATRONYMICS = ['Иванович', 'Петрович', 'Сергеевич', 'Андреевич', None]
+DEGREES = ['Кандидат наук', 'Доктор наук', None]
+POSITIONS = ['Доцент', 'Профессор', 'Заведующий кафедрой', 'Старший преподаватель', None]
+
+# Стандартные размеры наборов данных
+SIZES = {
+    '1k': 1_000,
+    '100k': 100_000,
+    '1m': 1_000_000,
+}
+
+# Номера до 001-001-998 не проверяются по контрольной сумме, начинаем выше
+_SNILS_BASE = 100_000_000
+
+
+def make_snils(index: int) -> str:
+    """Возвращает корректный СНИЛС (11 цифр) для порядкового номера."""
+    base = str(_SNILS_BASE + index).zfill(9)
+    total = sum(int(digit) * (9 - i) for i, digit in enumerate(base))
+    control_sum = total % 101
+    if control_sum == 100:
+        control_sum = 0
+    return f"{base}{control_sum:02d}"
+
+
+def make_teacher_data(index: int, rnd: random.Random | None = None) -> dict:
+    """Возвращает словарь с данными преподавателя без teacher_id."""
+    rnd = rnd or random.Random(index)
+    return {
+        'last_name': rnd.choice(LAST_NAMES),
+        'first_name': rnd.choice(FIRST_NAMES),
+        'patronymic': rnd.choice(PATRONYMICS),
+        'academic_degree': rnd.choice(DEGREES),
+        'administrative_position': rnd.choice(POSITIONS),
+        'experience_years': rnd.randint(0, 40),
+        'snils': make_snils(index)
+    }
+
+
+def generate_teachers(count: int, seed: int = 0) -> Iterator[dict]:
+    """Генерирует count записей преподавателей с последовательными ID."""
+    rnd = random.Random(seed)
+    for index in range(count):
+        data = make_teacher_data(index, rnd)
+        data['teacher_id'] = index + 1
+        yield data
+
+
+def parse_size(value: str) -> int:
+    """Возвращает число записей по имени размера ('1k', '100k', '1m') или числу."""
+    return SIZES[value.lower()] if value.lower() in SIZES else int(value)
+
+
+def write_json(filename: str, count: int, seed: int = 0):
+    """Записывает count преподавателей в JSON-файл формата TeacherRepJson."""
+    with open(filename, 'w', encoding='utf-8') as file:
+        json.dump(list(generate_teachers(count, seed)), file, ensure_ascii=False, indent=2)
+
+
+def write_yaml(filename: str, count: int, seed: int = 0):
+    """Записывает count преподавателей в YAML-файл формата TeacherRepYaml."""
+    with open(filename, 'w', encoding='utf-8') as file:
+        yaml.dump(list(generate_teachers(count, seed)), file, allow_unicode=True, sort_keys=False)
+
+
+def to_string(data: dict) -> str:
+    """Возвращает запись в строковом формате Teacher ('id;фамилия;...')."""
+    return ";".join("" if data[name] is None else str(data[name]) for name in (
+        'teacher_id', 'last_name', 'first_name', 'patronymic', 'academic_degree',
+        'administrative_position', 'experience_years', 'snils'))
+
+
+def to_json(data: dict) -> str:
+    """Возвращает запись в виде JSON-объекта."""
+    return json.dumps(data, ensure_ascii=False)
+
+
+def to_xml(data: dict) -> str:
+    """Возвращает запись в виде XML-элемента <teacher>."""
+    fields = "".join(f"<{name}>{value}</{name}>" for name, value in data.items() if value is not None)
+    return f"<teacher>{fields}</teacher>"
@@ -0,0 +1,43 @@
+"""Измерение времени выполнения для бенчмарков."""
+import statistics
+import timeit
+from typing import Callable
+
+# Минимальное время одного замера при автоподборе числа повторений
+_MIN_SAMPLE_SEC = 0.2
+
+
+def measure(name: str, func: Callable, number: int | None = None,
+            repeat: int = 5, setup: Callable | None = None, **params) -> dict:
+    """Замеряет func и возвращает результат в виде словаря для JSON.
+
+    number — число вызовов в одном замере (по умолчанию подбирается так,
+    чтобы замер длился не меньше 0.2 с), repeat — число замеров. setup
+    вызывается перед каждым замером и не входит во время. Дополнительные
+    параметры (например, rows) сохраняются в результате.
+    """
+    timer = timeit.Timer(func)
+    if number is None:
+        if setup:
+            setup()
+        number = 1
+        while timer.timeit(number) < _MIN_SAMPLE_SEC and number < 1_000_000:
+            number *= 10
+
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        samples.append(timer.timeit(number) / number)
+
+    best = min(samples)
+    return {
+        'name': name,
+        'number': number,
+        'repeat': repeat,
+        'best_sec': best,
+        'mean_sec': statistics.mean(samples),
+        'stdev_sec': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'ops_per_sec': 1 / best if best else float('inf'),
+        **params,
+    }
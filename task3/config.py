@@ -9,6 +9,81 @@ DB_PASSWORD: str = "1234"
 DATA_DIR: str = os.path.join(os.path.dirname(__file__), "data")
 JSON_FILENAME: str = os.path.join(DATA_DIR, "teachers.json")
 YAML_FILENAME: str = os.path.join(DATA_DIR, "teachers.yaml")
+JSON_FILE_PATH: str = JSON_FILENAME
+YAML_FILE_PATH: str = YAML_FILENAME
 
 REPOSITORY_TYPE: str = "json"
+REPO_TYPES: tuple = ("json", "yaml", "db")
+DEFAULT_REPO_TYPE: str = REPOSITORY_TYPE
 ITEMS_PER_PAGE: int = 10
+
+# Число строк, получаемых за один запрос серверным курсором БД
+DB_ITERSIZE: int = 1000
+
+# Параметры пакетного импорта (None — по числу ядер)
+IMPORT_WORKERS: int | None = None
+IMPORT_CHUNK_SIZE: int = 10000
+
+# Размер пакета изменений при синхронизации хранилищ
+SYNC_BATCH_SIZE: int = 1000
+
+# Журнал событий изменения данных (None — события не сохраняются)
+EVENT_LOG_PATH: str | None = os.path.join(DATA_DIR, "events.jsonl")
+
+# Размеры кэшей главной страницы: целых страниц и строк таблицы
+INDEX_PAGE_CACHE_SIZE: int = 64
+INDEX_ROW_CACHE_SIZE: int = 10000
+
+# Максимальный размер страницы JSON API
+API_MAX_PER_PAGE: int = 1000
+
+# Сбор метрик и маршрут /metrics в формате Prometheus
+METRICS_ENABLED: bool = True
+
+# Профилирование запросов: для всех запросов или только для подписанных
+# заголовком X-Profile вида «срок:подпись» (HMAC-SHA256 срока, пути и
+# отсортированных параметров запроса с ключом PROFILE_SECRET, см. profiling.sign).
+# Тот же ключ в заголовке X-Admin-Token открывает маршруты /admin/profiles и /admin/queries.
+PROFILING_ENABLED: bool = False
+PROFILE_SECRET: str | None = os.environ.get("PROFILE_SECRET")
+PROFILE_DIR: str = os.path.join(DATA_DIR, "profiles")
+PROFILE_RING_SIZE: int = 50
+
+# Журнал медленных SQL-запросов репозитория БД: порог в секундах (None —
+# запросы не учитываются), файл журнала и сохранение плана EXPLAIN ANALYZE
+DB_SLOW_QUERY_SECONDS: float | None = 0.1
+DB_SLOW_QUERY_LOG: str | None = os.path.join(DATA_DIR, "slow_queries.jsonl")
+DB_EXPLAIN_SLOW_QUERIES: bool = False
+
+# Прогрев при запуске: загрузка репозитория, компиляция шаблонов и
+# отрисовка главной страницы в фоновом потоке; до его окончания /readyz
+# отвечает 503
+WARM_UP_ON_START: bool = True
+
+# Сохранение файловых хранилищ: число резервных копий (teachers.json.1 ...)
+# и сброс данных на диск при каждой записи
+FILE_BACKUPS: int = 2
+FILE_FSYNC: bool = True
+
+# Отложенное сохранение файловых хранилищ: изменения записываются не
+# позже чем через SAVE_DELAY_MS мс или после SAVE_MAX_PENDING изменений
+# (0 — сохранять при каждом изменении)
+SAVE_DELAY_MS: int = 200
+SAVE_MAX_PENDING: int = 100
+
+# Кодеки файловых хранилищ (см. models.codecs): "auto" — самый быстрый
+# доступный (orjson, libyaml), иначе стандартный; JSON_COMPACT — JSON без отступов
+JSON_CODEC: str = "auto"
+JSON_COMPACT: bool = False
+YAML_CODEC: str = "auto"
+
+# Шардированное JSON хранилище (0 — один файл JSON_FILE_PATH): число шардов
+# и способ разбиения ("hash" — по остатку от ID, "range" — по диапазонам из
+# JSON_SHARD_RANGE_SIZE ID). Данные из JSON_FILE_PATH переносятся в шарды
+# при первом запуске. Шарды читаются параллельно ("thread" или "process")
+JSON_SHARDS: int = 0
+JSON_SHARD_DIR: str = os.path.join(DATA_DIR, "teachers_shards")
+JSON_SHARD_PARTITION: str = "hash"
+JSON_SHARD_RANGE_SIZE: int = 10000
+JSON_SHARD_WORKERS: int | None = None
+JSON_SHARD_EXECUTOR: str = "thread"
@@ -1,5 +1,20 @@
-from models.repositories import TeacherRepository, FilterDecorator
+from models.repositories import TeacherRepository, FilterDecorator, SortDecorator, TEACHER_FIELDS
 from controllers.subject import Subject, Observer
+from models.metrics import timed
+from models import profiling
+
+# Поля, которые читает каждый параметр фильтрации
+FILTER_FIELDS = {
+    'last_name': 'last_name',
+    'first_name': 'first_name',
+    'patronymic': 'patronymic',
+    'academic_degree': 'academic_degree',
+    'position': 'administrative_position',
+    'min_experience': 'experience_years',
+    'max_experience': 'experience_years'
+}
+# Поля, выводимые в таблице на главной странице
+INDEX_FIELDS = TEACHER_FIELDS
 
 
 class Controller:
@@ -88,29 +103,86 @@ class TeacherController(Subject, Controller):
         
         return sort_functions.get(sort_field)
     
-    def load_teachers(self, filter_params=None, sort_params=None):
-        """Загружает преподавателей с фильтрацией и сортировкой"""
-        teachers_count = self._repository.get_count()
-        
-        try:
+    def _decorate(self, filter_params, sort_params):
+        """Оборачивает репозиторий декораторами фильтрации и сортировки"""
+        with profiling.stage('build_filter'):
+            # При профилировании учитывается время чтения строк и вызовов фильтра
+            repository = profiling.timed_source(self._repository)
+
             # Применяем фильтрацию, если есть параметры
-            repository = self._repository
             if filter_params:
-                filter_func = self._get_filter_func(filter_params)
+                filter_func = profiling.timed_callable('filter', self._get_filter_func(filter_params))
                 if filter_func:
                     repository = FilterDecorator(repository, filter_func)
-            
+
             # Применяем сортировку, если есть параметры
             if sort_params and 'field' in sort_params:
                 sort_func = self._get_sort_func(sort_params['field'], sort_params.get('reverse', False))
                 if sort_func:
                     repository = SortDecorator(repository, sort_func, sort_params.get('reverse', False))
-            
-            teachers = repository.get_k_n_short_list(teachers_count, 1)
-        except IndexError:
-            teachers = []
+        return repository
+
+    @timed('controller', 'TeacherController.load_teachers')
+    def load_teachers(self, filter_params=None, sort_params=None) -> dict:
+        """Загружает преподавателей с фильтрацией и сортировкой и возвращает данные запроса"""
+        # Поколение читается до данных, чтобы не закэшировать их под более новым
+        generation, last_modified = self._repository.version()
+
+        # Читаются только выводимые поля, без создания объектов Teacher
+        repository = self._decorate(filter_params, sort_params)
+        with profiling.stage('load'):
+            teachers = list(repository.iter_rows(INDEX_FIELDS))
         
-        self.update(teachers)
+        data = {"teachers": teachers, "generation": generation, "last_modified": last_modified}
+        self.update(data)
+        return data
+
+
+class ApiTeacherController(TeacherController):
+    """Контроллер JSON API: читает из хранилища только нужные поля"""
+
+    @staticmethod
+    def _required_fields(fields, filter_params, sort_params):
+        """Добавляет к запрошенным полям поля, нужные фильтрации и сортировке"""
+        required = list(fields)
+        for name, value in (filter_params or {}).items():
+            if value and name in FILTER_FIELDS:
+                required.append(FILTER_FIELDS[name])
+        if sort_params and sort_params.get('field') in TEACHER_FIELDS:
+            required.append(sort_params['field'])
+        return tuple(dict.fromkeys(required))
+
+    @timed('controller', 'ApiTeacherController.load_teachers')
+    def load_teachers(self, filter_params=None, sort_params=None, page=1, per_page=10,
+                      fields=TEACHER_FIELDS):
+        """Загружает страницу преподавателей с фильтрацией и сортировкой"""
+        repository = self._decorate(filter_params, sort_params)
+        required = self._required_fields(fields, filter_params, sort_params)
+        with profiling.stage('load'):
+            teachers = repository.get_rows_page(per_page, page, required)
+            total = repository.get_count()
+        self.update({
+            "teachers": teachers,
+            "fields": fields,
+            "total": total,
+            "page": page,
+            "per_page": per_page
+        })
+
+    def get_teacher(self, teacher_id, fields=TEACHER_FIELDS):
+        """Загружает одного преподавателя по ID"""
+        self.update({"teacher": self._repository.get_row(teacher_id, fields), "fields": fields})
+
+
+class StatsController(Subject, Controller):
+    def __init__(self, repository: TeacherRepository):
+        Subject.__init__(self)
+        Controller.__init__(self, repository)
+
+    @timed('controller', 'StatsController.load_stats')
+    def load_stats(self):
+        """Загружает агрегированную статистику по преподавателям"""
+        self.update(self._repository.aggregate())
 
 
 class AddTeacherController(Subject, Controller):
@@ -121,7 +193,7 @@ class AddTeacherController(Subject, Controller):
     def add_teacher(self, teacher_data):
         try:
             teacher = self._repository.add_teacher(teacher_data)
-            self._repository.save_to_file()
+            self._repository.persist()
             self.update({"success": True, "teacher": teacher})
         except Exception as e:
             self.update({"success": False, "error": str(e)})
@@ -146,7 +218,7 @@ class UpdateTeacherController(Subject, Controller):
             self.current_teacher_id = teacher_id
             teacher = self._repository.update_teacher(teacher_id, teacher_data)
             if teacher:
-                self._repository.save_to_file()
+                self._repository.persist()
                 self.update({"success": True, "teacher": teacher})
             else:
                 self.update({"success": False, "error": "Преподаватель не найден", "teacher_id": teacher_id})
@@ -163,9 +235,21 @@ class DeleteTeacherController(Subject, Controller):
         try:
             success = self._repository.delete_teacher(teacher_id)
             if success:
-                self._repository.save_to_file()
+                self._repository.persist()
                 self.update({"success": True, "teacher_id": teacher_id})
             else:
                 self.update({"success": False, "error": "Преподаватель не найден"})
         except Exception as e:
             self.update({"success": False, "error": str(e)})
+
+    def delete_teachers(self, teacher_ids):
+        """Удаляет нескольких преподавателей с одним сохранением в файл"""
+        try:
+            deleted = self._repository.delete_many(teacher_ids)
+            if deleted:
+                self._repository.persist()
+                self.update({"success": True, "deleted": deleted})
+            else:
+                self.update({"success": False, "error": "Преподаватели не найдены"})
+        except Exception as e:
+            self.update({"success": False, "error": str(e)})
@@ -1,4 +1,5 @@
-from models.repositories import TeacherRepJson, TeacherRepYaml, TeacherRepDBAdapter
+from models.repositories import TeacherRepJson, TeacherRepJsonSharded, TeacherRepYaml, TeacherRepDBAdapter, \
+    LazyRepository
 from config import *
 
 
@@ -6,27 +7,63 @@ class CreateRepoFactory:
     """Фабрика для создания репозиториев"""
 
     @staticmethod
-    def create_repo(repo_type: str = DEFAULT_REPO_TYPE):
+    def create_repo(repo_type: str = DEFAULT_REPO_TYPE, change_feed=None, query_log=None):
         """
         Создает экземпляр репозитория по типу
 
         Args:
             repo_type: тип репозитория ('json', 'yaml', 'db')
+            change_feed: поток событий изменения данных (необязательно)
+            query_log: журнал SQL-запросов для репозитория БД (необязательно)
 
         Returns:
             Объект репозитория
         """
-        if repo_type == 'json':
-            return TeacherRepJson(JSON_FILE_PATH)
+        if repo_type == 'json' and JSON_SHARDS:
+            repo = TeacherRepJsonSharded(
+                JSON_SHARD_DIR,
+                shards=JSON_SHARDS,
+                partition=JSON_SHARD_PARTITION,
+                range_size=JSON_SHARD_RANGE_SIZE,
+                backups=FILE_BACKUPS,
+                fsync=FILE_FSYNC,
+                codec=JSON_CODEC,
+                compact=JSON_COMPACT,
+                workers=JSON_SHARD_WORKERS,
+                executor=JSON_SHARD_EXECUTOR,
+                legacy_filename=JSON_FILE_PATH
+            )
+        elif repo_type == 'json':
+            repo = TeacherRepJson(JSON_FILE_PATH, FILE_BACKUPS, FILE_FSYNC, JSON_CODEC, JSON_COMPACT)
         elif repo_type == 'yaml':
-            return TeacherRepYaml(YAML_FILE_PATH)
+            repo = TeacherRepYaml(YAML_FILE_PATH, FILE_BACKUPS, FILE_FSYNC, YAML_CODEC)
         elif repo_type == 'db':
-            return TeacherRepDBAdapter(
+            repo = TeacherRepDBAdapter(
                 host=DB_HOST,
                 database=DB_NAME,
                 username=DB_USER,
                 password=DB_PASSWORD,
-                port=DB_PORT
+                port=DB_PORT,
+                itersize=DB_ITERSIZE,
+                query_log=query_log
             )
         else:
             raise ValueError(f"Неизвестный тип репозитория: {repo_type}")
+
+        if repo_type in ('json', 'yaml') and SAVE_DELAY_MS:
+            repo.schedule_saves(SAVE_DELAY_MS / 1000, SAVE_MAX_PENDING)
+        if change_feed is not None:
+            repo.set_change_feed(change_feed)
+        return repo
+
+    @staticmethod
+    def create_lazy(repo_type: str = DEFAULT_REPO_TYPE, change_feed=None, query_log=None):
+        """
+        Возвращает репозиторий, который создается при первом обращении
+
+        Тип проверяется сразу, а чтение данных откладывается до первого запроса.
+        """
+        if repo_type not in REPO_TYPES:
+            raise ValueError(f"Неизвестный тип репозитория: {repo_type}")
+        return LazyRepository(
+            lambda: CreateRepoFactory.create_repo(repo_type, change_feed, query_log))
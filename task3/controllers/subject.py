@@ -0,0 +1,193 @@
+"""Субъект и наблюдатель с синхронной и асинхронной доставкой уведомлений."""
+from abc import ABC, abstractmethod
+from typing import Dict, List
+import queue
+import threading
+import time
+
+# Режимы доставки уведомлений наблюдателю
+SYNC = 'sync'
+ASYNC = 'async'
+
+# Поведение при переполнении очереди асинхронного наблюдателя
+BLOCK = 'block'
+DROP = 'drop'
+
+DEFAULT_MAX_QUEUE = 1000
+# Сколько секунд уведомляющий поток ждет места в очереди в режиме BLOCK
+DEFAULT_PUT_TIMEOUT = 1.0
+
+_STOP = object()
+
+
+class Observer(ABC):
+    """Интерфейс наблюдателя"""
+
+    @abstractmethod
+    def update(self, data):
+        """Получить обновление от субъекта"""
+        pass
+
+
+class _AsyncDelivery:
+    """Очередь и поток доставки уведомлений одному наблюдателю."""
+
+    def __init__(self, observer: Observer, max_queue: int, overflow: str, put_timeout: float | None):
+        """Создает очередь и запускает поток доставки."""
+        if overflow not in (BLOCK, DROP):
+            raise ValueError(f"Недопустимое поведение при переполнении: {overflow}")
+        self._observer = observer
+        self._overflow = overflow
+        self._put_timeout = put_timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name=f"observer-{type(observer).__name__}")
+        self._thread.start()
+
+    @property
+    def backlog(self) -> int:
+        """Возвращает число недоставленных уведомлений."""
+        return self._queue.qsize()
+
+    def offer(self, data):
+        """Ставит уведомление в очередь.
+
+        В режиме BLOCK ждет освобождения места не дольше put_timeout,
+        в режиме DROP не ждет; не поместившиеся уведомления учитываются
+        в dropped. После close() уведомления не принимаются и тоже
+        учитываются в dropped.
+        """
+        if self._closed:
+            self.dropped += 1
+            return
+        try:
+            if self._overflow == BLOCK:
+                self._queue.put(data, timeout=self._put_timeout)
+            else:
+                self._queue.put_nowait(data)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Доставляет уведомления наблюдателю по одному в порядке поступления."""
+        while True:
+            data = self._queue.get()
+            try:
+                if data is _STOP:
+                    return
+                try:
+                    self._observer.update(data)
+                except Exception as e:
+                    print(f"Ошибка наблюдателя {type(self._observer).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+            # Если close() не смог поставить _STOP в полную очередь,
+            # поток завершается, доставив оставшееся
+            if self._closed and self._queue.empty():
+                return
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Ждет доставки всех поставленных уведомлений.
+
+        Возвращает False при истечении timeout или если поток доставки уже
+        остановлен и оставшиеся уведомления доставить некому.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                if not self._thread.is_alive():
+                    return False
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float | None = None):
+        """Доставляет оставшиеся уведомления и останавливает поток.
+
+        Ждет не дольше timeout, в том числе места в полной очереди.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        # Ожидающие flush() проверяют, остался ли поток доставки
+        with self._queue.all_tasks_done:
+            self._queue.all_tasks_done.notify_all()
+
+
+class Subject(ABC):
+    """Интерфейс субъекта (наблюдаемого объекта)
+
+    Наблюдатели, прикрепленные в режиме SYNC, получают уведомление в
+    вызывающем потоке. Для наблюдателей в режиме ASYNC у каждого своя
+    ограниченная очередь и фоновый поток, поэтому медленный наблюдатель
+    не задерживает обработку запроса.
+    """
+
+    def __init__(self):
+        self._observers: List[Observer] = []
+        self._deliveries: Dict[Observer, _AsyncDelivery] = {}
+
+    def attach(self, observer: Observer, mode: str = SYNC,
+               max_queue: int = DEFAULT_MAX_QUEUE, overflow: str = BLOCK,
+               put_timeout: float | None = DEFAULT_PUT_TIMEOUT):
+        """Прикрепить наблюдателя"""
+        if mode not in (SYNC, ASYNC):
+            raise ValueError(f"Недопустимый режим доставки: {mode}")
+        if observer in self._observers:
+            return
+        if mode == ASYNC:
+            self._deliveries[observer] = _AsyncDelivery(observer, max_queue, overflow, put_timeout)
+        self._observers.append(observer)
+
+    def detach(self, observer: Observer):
+        """Открепить наблюдателя"""
+        if observer in self._observers:
+            self._observers.remove(observer)
+        delivery = self._deliveries.pop(observer, None)
+        if delivery:
+            delivery.close()
+
+    def update(self, data):
+        """Передать данные всем наблюдателям"""
+        for observer in list(self._observers):
+            delivery = self._deliveries.get(observer)
+            if delivery:
+                delivery.offer(data)
+            else:
+                observer.update(data)
+
+    def notify(self):
+        """Уведомить всех наблюдателей"""
+        self.update(self)
+
+    def dropped(self, observer: Observer) -> int:
+        """Возвращает число отброшенных уведомлений асинхронного наблюдателя."""
+        delivery = self._deliveries.get(observer)
+        return delivery.dropped if delivery else 0
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Ждет доставки уведомлений всем асинхронным наблюдателям."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for delivery in list(self._deliveries.values()):
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not delivery.flush(remaining):
+                return False
+        return True
+
+    def close(self, timeout: float | None = None):
+        """Доставляет оставшиеся уведомления и останавливает потоки доставки.
+
+        Закрытые доставки остаются привязанными к наблюдателям: последующие
+        уведомления учитываются в dropped и не выполняются в вызывающем потоке.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for delivery in list(self._deliveries.values()):
+            delivery.close(None if deadline is None else max(0.0, deadline - time.monotonic()))
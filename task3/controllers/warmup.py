@@ -0,0 +1,87 @@
+"""Прогрев приложения в фоновом потоке и состояние готовности."""
+from typing import Callable, List
+import threading
+import time
+
+PENDING = 'pending'
+RUNNING = 'running'
+READY = 'ready'
+FAILED = 'failed'
+
+
+class WarmUp:
+    """Выполняет шаги прогрева по порядку в фоновом потоке.
+
+    Пока шаги не выполнены, приложение живо, но не готово: балансировщик
+    не должен направлять на него трафик. При ошибке шага прогрев
+    прекращается, а состояние становится FAILED.
+    """
+
+    def __init__(self):
+        self._steps: List[tuple[str, Callable[[], None]]] = []
+        self._state = PENDING
+        self._error: str | None = None
+        self._timings: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def add_step(self, name: str, func: Callable[[], None]):
+        """Добавляет шаг прогрева."""
+        if self._state != PENDING:
+            raise ValueError("Нельзя добавить шаг после запуска прогрева")
+        self._steps.append((name, func))
+
+    @property
+    def state(self) -> str:
+        """Возвращает состояние прогрева."""
+        return self._state
+
+    @property
+    def ready(self) -> bool:
+        """Проверяет, завершен ли прогрев успешно."""
+        return self._state == READY
+
+    def status(self) -> dict:
+        """Возвращает состояние, ошибку и длительность выполненных шагов."""
+        with self._lock:
+            return {
+                'state': self._state,
+                'error': self._error,
+                'steps_sec': dict(self._timings)
+            }
+
+    def start(self, background: bool = True):
+        """Запускает прогрев; без шагов приложение сразу готово."""
+        with self._lock:
+            if self._state != PENDING:
+                return
+            self._state = RUNNING
+        if background:
+            self._thread = threading.Thread(target=self._run, daemon=True, name="warm-up")
+            self._thread.start()
+        else:
+            self._run()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Ждет окончания прогрева; возвращает True, если приложение готово."""
+        self._done.wait(timeout)
+        return self.ready
+
+    def _run(self):
+        try:
+            for name, func in self._steps:
+                start = time.perf_counter()
+                func()
+                with self._lock:
+                    self._timings[name] = time.perf_counter() - start
+        except Exception as e:
+            print(f"Ошибка прогрева: {e}")
+            with self._lock:
+                self._state = FAILED
+                self._error = f"{name}: {e}"
+        else:
+            with self._lock:
+                self._state = READY
+        finally:
+            self._done.set()
@@ -0,0 +1,36 @@
+"""Импорт преподавателей из файла в выбранное хранилище.
+
+Пример:
+    python import_teachers.py teachers.csv --repo json --workers 8
+"""
+import argparse
+
+import config
+from controllers.create_repo import CreateRepoFactory
+from models.importer import import_file
+from models.parser import FORMATS
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Импорт преподавателей из файла")
+    parser.add_argument('filename')
+    parser.add_argument('--repo', choices=config.REPO_TYPES, default=config.DEFAULT_REPO_TYPE)
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--workers', type=int, default=config.IMPORT_WORKERS)
+    parser.add_argument('--chunk-size', type=int, default=config.IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    def print_chunk(chunk):
+        print(f"Пакет {chunk.index}: {chunk.rows} записей, {chunk.errors} ошибок, "
+              f"{chunk.rows_per_sec:.0f} записей/с")
+
+    report = import_file(args.filename, CreateRepoFactory.create_repo(args.repo), args.format,
+                         args.workers, args.chunk_size, print_chunk)
+
+    for error in report.errors:
+        print(f"Строка {error.row}: {error.error}")
+    print(f"Импортировано: {report.imported}, ошибок: {len(report.errors)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""Кодеки чтения и записи файловых хранилищ (JSON, YAML).
+
+Модули кодеков импортируются при первом использовании. Если выбранный
+кодек недоступен (не установлен пакет или libyaml), используется
+стандартный кодек формата.
+"""
+from importlib.util import find_spec
+from typing import Callable, Dict, TextIO
+import json
+
+AUTO = 'auto'
+
+
+class Codec:
+    """Способ разбора и записи данных одного формата."""
+
+    def __init__(self, name: str, fmt: str, load: Callable[[TextIO], object],
+                 dump: Callable[[object, TextIO, bool], None],
+                 available: Callable[[], bool] = lambda: True):
+        self.name = name
+        self.format = fmt
+        self._load = load
+        self._dump = dump
+        self._available = available
+
+    @property
+    def available(self) -> bool:
+        """Проверяет, можно ли использовать кодек в текущем окружении."""
+        return self._available()
+
+    def load(self, file: TextIO):
+        """Разбирает данные из открытого файла."""
+        return self._load(file)
+
+    def dump(self, data, file: TextIO, compact: bool = False):
+        """Записывает данные в открытый файл; compact — JSON без отступов."""
+        self._dump(data, file, compact)
+
+    def __repr__(self):
+        return f"Codec({self.format}/{self.name})"
+
+
+# Кодеки по форматам в порядке предпочтения при выборе AUTO;
+# последний в списке — стандартный, он доступен всегда
+_CODECS: Dict[str, list] = {'json': [], 'yaml': []}
+
+
+def register_codec(codec: Codec, preferred: bool = False):
+    """Добавляет кодек формата; preferred — выбирать его раньше уже известных."""
+    codecs = _CODECS.setdefault(codec.format, [])
+    codecs[:] = [known for known in codecs if known.name != codec.name]
+    codecs.insert(0 if preferred else max(0, len(codecs) - 1), codec)
+
+
+def available_codecs(fmt: str) -> list:
+    """Возвращает имена доступных кодеков формата в порядке предпочтения."""
+    return [codec.name for codec in _CODECS.get(fmt, []) if codec.available]
+
+
+def get_codec(fmt: str, name: str = AUTO) -> Codec:
+    """Возвращает кодек формата по имени или лучший доступный для AUTO.
+
+    Недоступный кодек заменяется стандартным.
+    """
+    codecs = _CODECS.get(fmt)
+    if not codecs:
+        raise ValueError(f"Неизвестный формат: {fmt}")
+    if name == AUTO:
+        return next(codec for codec in codecs if codec.available)
+    for codec in codecs:
+        if codec.name == name:
+            if codec.available:
+                return codec
+            print(f"Кодек {fmt}/{name} недоступен, используется {codecs[-1].name}")
+            return codecs[-1]
+    raise ValueError(f"Неизвестный кодек {fmt}: {name}")
+
+
+def _module_available(name: str) -> Callable[[], bool]:
+    return lambda: find_spec(name) is not None
+
+
+# JSON: стандартная библиотека
+
+def _json_dump(data, file, compact):
+    if compact:
+        json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+    else:
+        json.dump(data, file, ensure_ascii=False, indent=2)
+
+
+register_codec(Codec('stdlib', 'json', json.load, _json_dump))
+
+
+# JSON: orjson (в несколько раз быстрее, пишет тот же формат)
+
+def _orjson_load(file):
+    import orjson
+    # orjson.JSONDecodeError — подкласс json.JSONDecodeError
+    return orjson.loads(file.read())
+
+
+def _orjson_dump(data, file, compact):
+    import orjson
+    file.write(orjson.dumps(data, option=0 if compact else orjson.OPT_INDENT_2).decode('utf-8'))
+
+
+register_codec(Codec('orjson', 'json', _orjson_load, _orjson_dump, _module_available('orjson')),
+               preferred=True)
+
+
+# YAML: реализация на Python и на libyaml (CSafeLoader/CSafeDumper)
+
+def _yaml_load(loader_name: str):
+    def load(file):
+        import yaml
+        return yaml.load(file, Loader=getattr(yaml, loader_name))
+    return load
+
+
+def _yaml_dump(dumper_name: str):
+    def dump(data, file, compact):
+        import yaml
+        yaml.dump(data, file, Dumper=getattr(yaml, dumper_name), allow_unicode=True,
+                  default_flow_style=False, indent=2)
+    return dump
+
+
+def _libyaml_available() -> bool:
+    if find_spec('yaml') is None:
+        return False
+    import yaml
+    return yaml.__with_libyaml__
+
+
+register_codec(Codec('pure', 'yaml', _yaml_load('SafeLoader'), _yaml_dump('SafeDumper')))
+register_codec(Codec('libyaml', 'yaml', _yaml_load('CSafeLoader'), _yaml_dump('CSafeDumper'),
+                     _libyaml_available), preferred=True)
@@ -0,0 +1,269 @@
+"""Поток событий изменения данных преподавателей (change data capture)."""
+from typing import Callable, Iterator, List, NamedTuple
+import json
+import os
+import queue
+import threading
+import time
+from .snils import Snils
+from .teacher import TeacherSnapshot
+
+ADDED = 'added'
+UPDATED = 'updated'
+DELETED = 'deleted'
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_QUEUE = 10000
+
+
+class ChangeEvent(NamedTuple):
+    """Изменение одного преподавателя.
+
+    seq — сквозной номер события (смещение в журнале), before/after —
+    снимки до и после изменения (None для добавления и удаления).
+    """
+    seq: int
+    kind: str
+    teacher_id: int
+    before: TeacherSnapshot | None
+    after: TeacherSnapshot | None
+    timestamp: float
+
+    def to_dict(self) -> dict:
+        """Возвращает событие в виде словаря для записи в журнал."""
+        return {
+            'seq': self.seq,
+            'kind': self.kind,
+            'teacher_id': self.teacher_id,
+            'before': _snapshot_to_dict(self.before),
+            'after': _snapshot_to_dict(self.after),
+            'timestamp': self.timestamp
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'ChangeEvent':
+        """Создает событие из словаря журнала."""
+        return ChangeEvent(data['seq'], data['kind'], data['teacher_id'],
+                           _snapshot_from_dict(data['before']),
+                           _snapshot_from_dict(data['after']),
+                           data['timestamp'])
+
+
+def _snapshot_to_dict(snapshot: TeacherSnapshot | None) -> dict | None:
+    if snapshot is None:
+        return None
+    data = snapshot._asdict()
+    data['snils_value'] = snapshot.snils
+    return data
+
+
+def _snapshot_from_dict(data: dict | None) -> TeacherSnapshot | None:
+    if data is None:
+        return None
+    return TeacherSnapshot(**dict(data, snils_value=Snils.parse(data['snils_value'])))
+
+
+def _parse_line(line) -> dict | None:
+    """Разбирает строку журнала; None для пустой или поврежденной строки."""
+    if not line.strip():
+        return None
+    try:
+        data = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    if not isinstance(data, dict) or not isinstance(data.get('seq'), int):
+        return None
+    return data
+
+
+class EventLog:
+    """Журнал событий в формате JSON Lines с воспроизведением с любого смещения."""
+
+    def __init__(self, filename: str, fsync: bool = False):
+        """Открывает журнал; fsync=True гарантирует запись на диск после каждого пакета."""
+        self._filename = filename
+        self._fsync = fsync
+        self._lock = threading.Lock()
+        self._last_seq = self._recover()
+        self._file = open(filename, 'a', encoding='utf-8')
+
+    def _recover(self) -> int:
+        """Возвращает номер последнего события и удаляет недописанную строку.
+
+        После сбоя последняя строка журнала может быть записана не полностью;
+        она обрезается, чтобы новые события не дописывались к ней.
+        """
+        last_seq = 0
+        try:
+            with open(self._filename, 'rb+') as file:
+                offset = 0
+                for line in file:
+                    data = _parse_line(line)
+                    if data is not None:
+                        last_seq = max(last_seq, data['seq'])
+                    elif not line.endswith(b"\n"):
+                        print(f"Журнал {self._filename}: удалена недописанная строка")
+                        file.truncate(offset)
+                        break
+                    offset += len(line)
+                else:
+                    if offset and not line.endswith(b"\n"):
+                        # Событие записано полностью, но без перевода строки
+                        file.seek(0, os.SEEK_END)
+                        file.write(b"\n")
+        except FileNotFoundError:
+            pass
+        return last_seq
+
+    @property
+    def last_seq(self) -> int:
+        """Возвращает номер последнего записанного события."""
+        return self._last_seq
+
+    def append(self, events: List[ChangeEvent]):
+        """Дописывает пакет событий в журнал."""
+        lines = "".join(json.dumps(event.to_dict(), ensure_ascii=False) + "\n"
+                        for event in events)
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+            if self._fsync:
+                os.fsync(self._file.fileno())
+            if events:
+                self._last_seq = events[-1].seq
+
+    def replay(self, offset: int = 0) -> Iterator[ChangeEvent]:
+        """Возвращает события с номером больше offset в порядке записи."""
+        with open(self._filename, 'r', encoding='utf-8') as file:
+            for line in file:
+                data = _parse_line(line)
+                # Поврежденные строки пропускаются: события после них остаются доступны
+                if data is not None and data['seq'] > offset:
+                    yield ChangeEvent.from_dict(data)
+
+    def close(self):
+        """Закрывает журнал."""
+        with self._lock:
+            self._file.close()
+
+
+class Subscription:
+    """Подписка на события с собственной ограниченной очередью и потоком доставки.
+
+    Если подписчик не успевает и очередь переполнена, новые события для него
+    отбрасываются и учитываются в dropped; пропущенное можно получить из
+    журнала через ChangeFeed.replay(last_seq).
+    """
+
+    def __init__(self, callback: Callable[[List[ChangeEvent]], None],
+                 batch_size: int, max_queue: int):
+        """Создает подписку и запускает поток доставки."""
+        self._callback = callback
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_queue)
+        self.dropped = 0
+        self.last_seq = 0
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="change-feed-subscriber")
+        self._thread.start()
+
+    def offer(self, event: ChangeEvent):
+        """Ставит событие в очередь без блокировки публикующего потока."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        """Доставляет события подписчику пакетами до batch_size."""
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            batch = [event]
+            while len(batch) < self._batch_size:
+                try:
+                    event = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if event is None:
+                    self._deliver(batch)
+                    return
+                batch.append(event)
+            self._deliver(batch)
+
+    def _deliver(self, batch: List[ChangeEvent]):
+        try:
+            self._callback(batch)
+        except Exception as e:
+            print(f"Ошибка подписчика на события: {e}")
+        self.last_seq = batch[-1].seq
+
+    def close(self, timeout: float | None = None):
+        """Доставляет оставшиеся события и останавливает поток."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+
+class ChangeFeed:
+    """Рассылает события изменения подписчикам и пишет их в журнал."""
+
+    def __init__(self, log: EventLog | None = None):
+        """Создает поток событий; без журнала события не сохраняются."""
+        self._log = log
+        self._lock = threading.Lock()
+        self._seq = log.last_seq if log else 0
+        self._subscriptions: List[Subscription] = []
+
+    def subscribe(self, callback: Callable[[List[ChangeEvent]], None],
+                  batch_size: int = DEFAULT_BATCH_SIZE,
+                  max_queue: int = DEFAULT_MAX_QUEUE) -> Subscription:
+        """Подписывает callback на пакеты событий."""
+        subscription = Subscription(callback, batch_size, max_queue)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Отменяет подписку, дождавшись доставки очереди."""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+        subscription.close()
+
+    def publish(self, changes: List[tuple]):
+        """Публикует пакет изменений вида (kind, before, after).
+
+        События получают номера, записываются в журнал и передаются
+        подписчикам в одном порядке.
+        """
+        if not changes:
+            return
+        with self._lock:
+            now = time.time()
+            events = []
+            for kind, before, after in changes:
+                self._seq += 1
+                teacher_id = (after or before).teacher_id
+                events.append(ChangeEvent(self._seq, kind, teacher_id, before, after, now))
+            if self._log:
+                self._log.append(events)
+            for subscription in self._subscriptions:
+                for event in events:
+                    subscription.offer(event)
+
+    def replay(self, offset: int = 0) -> Iterator[ChangeEvent]:
+        """Воспроизводит события из журнала начиная после offset."""
+        if self._log is None:
+            raise ValueError("Журнал событий не настроен")
+        return self._log.replay(offset)
+
+    def close(self):
+        """Останавливает подписчиков и закрывает журнал."""
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+        for subscription in subscriptions:
+            subscription.close()
+        if self._log:
+            self._log.close()
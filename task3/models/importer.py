@@ -0,0 +1,138 @@
+"""Параллельный импорт преподавателей из файлов."""
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, NamedTuple
+import os
+import time
+from .teacher import Teacher
+from .parser import TeacherParser, RowError, PARAMS_BUILDERS, build_teacher
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+class ChunkReport(NamedTuple):
+    """Статистика обработки одного пакета записей."""
+    index: int
+    rows: int
+    errors: int
+    seconds: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Возвращает пропускную способность проверки пакета."""
+        return self.rows / self.seconds if self.seconds else float('inf')
+
+
+class ImportReport(NamedTuple):
+    """Итог импорта: число добавленных записей, ошибки и статистика пакетов."""
+    imported: int
+    errors: List[RowError]
+    chunks: List[ChunkReport]
+
+
+def _validate_chunk(fmt: str, chunk: list) -> tuple[list, float]:
+    """Создает и проверяет преподавателей пакета (выполняется в рабочем процессе)."""
+    start = time.perf_counter()
+    to_params = PARAMS_BUILDERS[fmt]
+    results = []
+    for row, raw in chunk:
+        if isinstance(raw, RowError):
+            results.append((row, raw))
+        else:
+            results.append((row, build_teacher(row, to_params, raw)))
+    return results, time.perf_counter() - start
+
+
+def _chunks(records: Iterable, chunk_size: int) -> Iterator[list]:
+    """Делит поток записей на списки по chunk_size."""
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+def validate_records(records: Iterable[tuple[int, object]], fmt: str,
+                     workers: int | None = None,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     on_chunk: Callable[[ChunkReport], None] | None = None
+                     ) -> Iterator[tuple[int, Teacher | RowError]]:
+    """Проверяет сырые записи пакетами в пуле процессов.
+
+    Результаты возвращаются в порядке входных записей. В работе находится
+    не больше 2 * workers пакетов, поэтому вход читается по мере обработки.
+    При workers == 1 пул не создается.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = enumerate(_chunks(records, chunk_size))
+
+    def report(index, results, seconds):
+        if on_chunk:
+            errors = sum(1 for _, result in results if isinstance(result, RowError))
+            on_chunk(ChunkReport(index, len(results), errors, seconds))
+
+    if workers == 1:
+        for index, chunk in chunks:
+            results, seconds = _validate_chunk(fmt, chunk)
+            report(index, results, seconds)
+            yield from results
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for index, chunk in chunks:
+            pending.append((index, executor.submit(_validate_chunk, fmt, chunk)))
+            if len(pending) >= 2 * workers:
+                done_index, future = pending.popleft()
+                results, seconds = future.result()
+                report(done_index, results, seconds)
+                yield from results
+        while pending:
+            done_index, future = pending.popleft()
+            results, seconds = future.result()
+            report(done_index, results, seconds)
+            yield from results
+
+
+def import_file(filename: str, repository, fmt: str | None = None,
+                workers: int | None = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                on_chunk: Callable[[ChunkReport], None] | None = None) -> ImportReport:
+    """Импортирует файл в репозиторий с параллельной проверкой записей.
+
+    Преподаватели добавляются в порядке следования в файле с сохранением
+    ID в рамках одной транзакции репозитория. Записи с занятым ID или
+    СНИЛС попадают в ошибки.
+    """
+    parser = TeacherParser(fmt)
+    errors: List[RowError] = []
+    chunks: List[ChunkReport] = []
+    # Пары (строка, преподаватель) держат объекты живыми до сопоставления
+    # отклоненных: id() освобожденного объекта может достаться другому
+    valid: List[tuple[int, Teacher]] = []
+
+    def collect(report: ChunkReport):
+        chunks.append(report)
+        if on_chunk:
+            on_chunk(report)
+
+    def valid_teachers(results):
+        for row, result in results:
+            if isinstance(result, RowError):
+                errors.append(result)
+            else:
+                valid.append((row, result))
+                yield result
+
+    with open(filename, 'r', encoding='utf-8', newline='') as file:
+        fmt = parser.detect_format(file)
+        results = validate_records(parser.iter_records(file, fmt), fmt,
+                                   workers, chunk_size, collect)
+        with repository.transaction():
+            rejected = repository.add_teachers(valid_teachers(results))
+
+    rejected_ids = {id(teacher) for teacher in rejected}
+    for row, teacher in valid:
+        if id(teacher) in rejected_ids:
+            errors.append(RowError(row, f"Преподаватель с ID {teacher.teacher_id} или СНИЛС "
+                                        f"{teacher.snils} уже существует"))
+    errors.sort(key=lambda error: error.row)
+    return ImportReport(len(valid) - len(rejected_ids), errors, chunks)
@@ -0,0 +1,243 @@
+"""Счетчики и гистограммы времени выполнения с выводом в формате Prometheus."""
+from bisect import bisect_left
+from functools import wraps
+from typing import Callable, Dict, Iterable, Iterator, List
+import inspect
+import threading
+import time
+
+# Границы интервалов гистограмм времени (в секундах)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterValue:
+    """Значение счетчика для одного набора меток."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        """Увеличивает счетчик на amount."""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        """Возвращает текущее значение."""
+        return self._value
+
+
+class _HistogramValue:
+    """Гистограмма для одного набора меток."""
+
+    def __init__(self, buckets: tuple):
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        """Учитывает наблюдение value."""
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> tuple[list, float]:
+        """Возвращает накопленные по интервалам количества и сумму."""
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        cumulative, running = [], 0
+        for value in counts:
+            running += value
+            cumulative.append(running)
+        return cumulative, total
+
+
+class Metric:
+    """Метрика с метками; значения для каждого набора меток создаются при первом обращении."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_value(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Возвращает значение метрики для набора меток."""
+        value = self._values.get(values)
+        if value is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"Метрика {self.name} ожидает метки {self.label_names}")
+            with self._lock:
+                value = self._values.setdefault(values, self._new_value())
+        return value
+
+    def collect(self) -> Iterator[str]:
+        """Возвращает строки метрики в текстовом формате Prometheus."""
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for labels, value in sorted(self._values.items()):
+            yield from self._collect_value(labels, value)
+
+    def _collect_value(self, labels: tuple, value) -> Iterator[str]:
+        raise NotImplementedError
+
+
+class Counter(Metric):
+    """Монотонно растущий счетчик."""
+
+    kind = 'counter'
+
+    def _new_value(self):
+        return _CounterValue()
+
+    def inc(self, amount: float = 1):
+        """Увеличивает счетчик без меток."""
+        self.labels().inc(amount)
+
+    def _collect_value(self, labels, value):
+        yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value.value)}"
+
+
+class Histogram(Metric):
+    """Гистограмма длительностей."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self._buckets = tuple(sorted(buckets))
+
+    def _new_value(self):
+        return _HistogramValue(self._buckets)
+
+    def observe(self, value: float):
+        """Учитывает наблюдение для гистограммы без меток."""
+        self.labels().observe(value)
+
+    def _collect_value(self, labels, value):
+        counts, total = value.snapshot()
+        for bound, bucket_count in zip(self._buckets + (float('inf'),), counts):
+            le = f'le="{_format_value(bound)}"'
+            yield f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {bucket_count}"
+        label_text = _format_labels(self.label_names, labels)
+        yield f"{self.name}_sum{label_text} {_format_value(total)}"
+        yield f"{self.name}_count{label_text} {counts[-1]}"
+
+
+class Registry:
+    """Набор метрик приложения.
+
+    Кроме собственных метрик, можно зарегистрировать сборщики — функции,
+    возвращающие кортежи (имя, тип, описание, [(метки, значение), ...]) для
+    значений, которые хранятся в других объектах (например, счетчики кэшей).
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str, labels: tuple = ()) -> Counter:
+        """Возвращает счетчик, создавая его при первом обращении."""
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        """Возвращает гистограмму, создавая ее при первом обращении."""
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple]]):
+        """Добавляет сборщик значений, вычисляемых при выводе."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def expose(self) -> str:
+        """Возвращает все метрики в текстовом формате Prometheus."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        for collector in list(self._collectors):
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    names, values = tuple(labels), tuple(labels.values())
+                    lines.append(f"{name}{_format_labels(names, values)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+OPERATION_SECONDS = REGISTRY.histogram(
+    'teachers_operation_duration_seconds',
+    "Длительность операций репозиториев, контроллеров и представлений",
+    ('component', 'operation'))
+
+
+def timed(component: str, operation: str | None = None) -> Callable:
+    """Декоратор, учитывающий время вызова в OPERATION_SECONDS.
+
+    Предназначен для крупных операций (чтение файла, запрос к БД,
+    отрисовка): накладные расходы — около микросекунды на вызов.
+    Функции-генераторы не оборачиваются, так как их вызов не выполняет работу.
+    """
+    def decorator(func):
+        if inspect.isgeneratorfunction(func):
+            return func
+        histogram = OPERATION_SECONDS.labels(component, operation or func.__name__)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not REGISTRY.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def instrument(cls: type, component: str, methods: Iterable[str]) -> type:
+    """Оборачивает перечисленные методы класса декоратором timed."""
+    for name in methods:
+        setattr(cls, name, timed(component, name)(cls.__dict__[name]))
+    return cls
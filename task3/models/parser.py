@@ -0,0 +1,168 @@
+"""Пакетный разбор файлов с преподавателями (строки, JSON, JSON Lines, XML)."""
+from typing import Iterable, Iterator, NamedTuple, TextIO
+import csv
+import json
+from .teacher import Teacher
+
+FORMAT_STRING = 'string'
+FORMAT_JSON = 'json'
+FORMAT_JSONL = 'jsonl'
+FORMAT_XML = 'xml'
+FORMATS = (FORMAT_STRING, FORMAT_JSON, FORMAT_JSONL, FORMAT_XML)
+
+
+class RowError(NamedTuple):
+    """Ошибка разбора одной записи (row — номер записи, начиная с 1)."""
+    row: int
+    error: str
+
+
+class TeacherParser:
+    """Разбирает файл целиком за один проход.
+
+    Формат определяется один раз по первому значащему символу файла, а не
+    для каждой записи: '[' — массив JSON, '{' — JSON Lines, '<' — XML
+    документ с элементами <teacher>, иначе — строки с разделителем ';'.
+    Для каждой записи возвращается Teacher или RowError.
+    """
+
+    def __init__(self, fmt: str | None = None):
+        """Инициализирует парсер; fmt=None включает автоопределение формата."""
+        if fmt is not None and fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+        self._format = fmt
+
+    @property
+    def format(self) -> str | None:
+        """Возвращает заданный формат."""
+        return self._format
+
+    def parse_file(self, filename: str) -> Iterator[Teacher | RowError]:
+        """Разбирает файл по имени."""
+        # newline='' нужен csv и не мешает остальным форматам
+        with open(filename, 'r', encoding='utf-8', newline='') as file:
+            yield from self.parse(file)
+
+    def parse(self, stream: TextIO) -> Iterator[Teacher | RowError]:
+        """Разбирает открытый текстовый поток."""
+        fmt = self.detect_format(stream)
+        to_params = PARAMS_BUILDERS[fmt]
+        for row, raw in self.iter_records(stream, fmt):
+            if isinstance(raw, RowError):
+                yield raw
+            else:
+                yield build_teacher(row, to_params, raw)
+
+    @staticmethod
+    def parse_records(records: Iterable[dict]) -> Iterator[Teacher | RowError]:
+        """Создает преподавателей из уже декодированных словарей."""
+        for row, record in enumerate(records, 1):
+            yield build_teacher(row, Teacher._params_from_dict, record)
+
+    def detect_format(self, stream: TextIO) -> str:
+        """Возвращает заданный формат или определяет его по первому значащему символу.
+
+        Позиция чтения потока не меняется.
+        """
+        if self._format:
+            return self._format
+
+        position = stream.tell()
+        char = ' '
+        while char and char.isspace():
+            char = stream.read(1)
+        stream.seek(position)
+
+        if char == '[':
+            return FORMAT_JSON
+        if char == '{':
+            return FORMAT_JSONL
+        if char == '<':
+            return FORMAT_XML
+        return FORMAT_STRING
+
+    @staticmethod
+    def iter_records(stream: TextIO, fmt: str) -> Iterator[tuple[int, object]]:
+        """Возвращает пары (номер записи, сырая запись) без создания Teacher.
+
+        Сырая запись передается в PARAMS_BUILDERS[fmt]; записи, которые не
+        удалось прочитать, возвращаются как RowError.
+        """
+        if fmt == FORMAT_STRING:
+            return _string_records(stream)
+        if fmt == FORMAT_JSON:
+            return _json_array_records(stream)
+        if fmt == FORMAT_JSONL:
+            return _json_lines_records(stream)
+        return _xml_records(stream)
+
+
+def _string_records(stream: TextIO) -> Iterator[tuple[int, object]]:
+    """Читает строки формата id;last_name;...;snils через csv."""
+    reader = csv.reader(stream, delimiter=';')
+    for parts in reader:
+        if not parts or (len(parts) == 1 and not parts[0].strip()):
+            continue
+        yield reader.line_num, parts
+
+
+def _json_array_records(stream: TextIO) -> Iterator[tuple[int, object]]:
+    """Читает JSON массив объектов одним вызовом json.load."""
+    try:
+        data = json.load(stream)
+    except json.JSONDecodeError as e:
+        yield 0, RowError(0, f"Invalid JSON format: {e}")
+        return
+
+    if not isinstance(data, list):
+        yield 0, RowError(0, "JSON document must be an array")
+        return
+
+    yield from enumerate(data, 1)
+
+
+def _json_lines_records(stream: TextIO) -> Iterator[tuple[int, object]]:
+    """Читает JSON Lines: по одному объекту в строке."""
+    for row, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            # Строка декодируется при создании Teacher, в том числе в рабочем процессе
+            yield row, line
+
+
+def _xml_records(stream: TextIO) -> Iterator[tuple[int, object]]:
+    """Читает XML потоково через iterparse, освобождая обработанные элементы."""
+    from xml.etree import ElementTree as ET
+    row = 0
+    try:
+        root = None
+        for event, element in ET.iterparse(stream, events=('start', 'end')):
+            if root is None:
+                root = element
+            if event != 'end' or element.tag != 'teacher':
+                continue
+            row += 1
+            try:
+                yield row, Teacher._xml_fields(element)
+            except ValueError as e:
+                yield row, RowError(row, str(e))
+            root.clear()
+    except ET.ParseError as e:
+        yield row + 1, RowError(row + 1, f"Invalid XML format: {e}")
+
+
+# Преобразование сырой записи каждого формата в параметры Teacher
+PARAMS_BUILDERS = {
+    FORMAT_STRING: Teacher._params_from_parts,
+    FORMAT_JSON: Teacher._params_from_dict,
+    FORMAT_JSONL: Teacher._parse_json,
+    FORMAT_XML: Teacher._params_from_xml_fields,
+}
+
+
+def build_teacher(row: int, to_params, raw) -> Teacher | RowError:
+    """Преобразует запись в параметры и создает Teacher с проверкой."""
+    try:
+        return Teacher(**to_params(raw))
+    except (ValueError, TypeError, KeyError) as e:
+        return RowError(row, str(e))
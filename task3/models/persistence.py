@@ -0,0 +1,148 @@
+"""Отложенное сохранение файловых репозиториев с объединением записей."""
+from typing import Callable
+import atexit
+import logging
+import threading
+import time
+import weakref
+
+logger = logging.getLogger(__name__)
+
+# Планировщики, которые нужно сбросить при завершении процесса
+_SCHEDULERS = weakref.WeakSet()
+
+# Наибольшая пауза (в секундах) между повторами неудачного сохранения
+MAX_RETRY_DELAY = 60
+
+
+class SaveScheduler:
+    """Объединяет изменения и сохраняет их из фонового потока.
+
+    После mark_dirty() данные сохраняются не позже чем через delay секунд
+    или сразу после max_pending изменений, поэтому серия правок приводит
+    к одной записи файла. flush() сохраняет немедленно, а при завершении
+    процесса несохраненные изменения записываются автоматически. После
+    ошибки сохранение повторяется не раньше чем через delay секунд,
+    и пауза удваивается с каждой следующей ошибкой.
+    """
+
+    def __init__(self, save: Callable[[], None], delay: float, max_pending: int):
+        if delay < 0 or max_pending < 1:
+            raise ValueError("Недопустимые параметры отложенного сохранения")
+        self._save = save
+        self._delay = delay
+        self._max_pending = max_pending
+        self._cond = threading.Condition()
+        # Сохранения выполняются по одному, изменения отмечаются без ожидания записи
+        self._save_lock = threading.Lock()
+        self._pending = 0
+        self._first_dirty: float | None = None
+        # Время, раньше которого фоновый поток не повторяет неудачное сохранение
+        self._retry_at: float | None = None
+        self._failures = 0
+        self._closed = False
+        self._thread: threading.Thread | None = None
+        self.saves = 0
+        self.errors = 0
+        _SCHEDULERS.add(self)
+
+    @property
+    def pending(self) -> int:
+        """Возвращает число несохраненных изменений."""
+        return self._pending
+
+    def mark_dirty(self):
+        """Отмечает изменение данных; после закрытия сохраняет сразу."""
+        with self._cond:
+            closed = self._closed
+            self._pending += 1
+            if self._first_dirty is None:
+                self._first_dirty = time.monotonic()
+            if not closed:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True,
+                                                    name="save-scheduler")
+                    self._thread.start()
+                self._cond.notify()
+        if closed:
+            self.flush()
+
+    def _wait_for_flush(self) -> bool:
+        """Ждет срока сохранения; False, если планировщик закрыт."""
+        with self._cond:
+            while not self._closed and self._pending:
+                if self._retry_at is not None:
+                    # После ошибки ждем паузу независимо от числа изменений
+                    deadline = self._retry_at
+                elif self._pending >= self._max_pending:
+                    break
+                else:
+                    deadline = self._first_dirty + self._delay
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return not self._closed
+
+    def _run(self):
+        # Поток работает, пока есть несохраненные изменения, и завершается
+        # в простое, чтобы не удерживать ненужный репозиторий
+        while self._wait_for_flush():
+            try:
+                self.flush()
+            except Exception:
+                # Изменения остались отмеченными; повтор — через delay
+                pass
+            with self._cond:
+                if not self._pending:
+                    self._thread = None
+                    return
+
+    def flush(self) -> bool:
+        """Сохраняет изменения немедленно; возвращает False, если сохранять нечего."""
+        with self._save_lock:
+            with self._cond:
+                pending = self._pending
+                if not pending:
+                    return False
+                self._pending = 0
+                self._first_dirty = None
+            try:
+                self._save()
+            except Exception as e:
+                with self._cond:
+                    self._pending += pending
+                    if self._first_dirty is None:
+                        self._first_dirty = time.monotonic()
+                    self._failures += 1
+                    retry_delay = min(max(self._delay, 0.001) * 2 ** (self._failures - 1),
+                                      MAX_RETRY_DELAY)
+                    self._retry_at = time.monotonic() + retry_delay
+                self.errors += 1
+                logger.error("Ошибка отложенного сохранения (повтор через %.3f с): %s",
+                             retry_delay, e)
+                raise
+            with self._cond:
+                self._failures = 0
+                self._retry_at = None
+            self.saves += 1
+            return True
+
+    def close(self, timeout: float | None = None):
+        """Останавливает фоновый поток и сохраняет оставшиеся изменения."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        self.flush()
+
+
+@atexit.register
+def _flush_all():
+    for scheduler in list(_SCHEDULERS):
+        try:
+            scheduler.close()
+        except Exception:
+            pass
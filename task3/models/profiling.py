@@ -0,0 +1,283 @@
+"""Профилирование отдельных запросов с разбивкой времени по этапам."""
+from contextlib import contextmanager
+from typing import Callable, List
+import cProfile
+import hashlib
+import hmac
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from urllib.parse import urlencode
+
+_local = threading.local()
+
+
+class RequestProfile:
+    """Профиль одного запроса: cProfile и время этапов."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = time.time()
+        self.duration = 0.0
+        self.stages: dict[str, float] = {}
+        self.profiler = cProfile.Profile()
+        self._start = time.perf_counter()
+
+    def add(self, stage_name: str, seconds: float):
+        """Добавляет время к этапу."""
+        self.stages[stage_name] = self.stages.get(stage_name, 0.0) + seconds
+
+    def finish(self):
+        """Останавливает профилировщик и фиксирует длительность."""
+        self.profiler.disable()
+        self.duration = time.perf_counter() - self._start
+
+    def breakdown(self) -> dict:
+        """Возвращает время этапов.
+
+        Этап load раскладывается на fetch (получение строк из хранилища),
+        filter (вызовы функции фильтрации) и sort (остаток: сортировка и
+        сборка результата). Время вне этапов попадает в other.
+        """
+        stages = dict(self.stages)
+        load = stages.pop('load', None)
+        if load is not None:
+            filter_time = stages.get('filter', 0.0)
+            if 'fetch' in stages:
+                stages['sort'] = max(0.0, load - stages['fetch'] - filter_time)
+            else:
+                stages['fetch'] = max(0.0, load - filter_time)
+        stages['other'] = max(0.0, self.duration - sum(stages.values()))
+        return stages
+
+
+def start(name: str) -> RequestProfile:
+    """Начинает профилирование запроса в текущем потоке."""
+    profile = RequestProfile(name)
+    _local.profile = profile
+    profile.profiler.enable()
+    return profile
+
+
+def finish() -> RequestProfile | None:
+    """Завершает профилирование текущего потока и возвращает профиль."""
+    profile = getattr(_local, 'profile', None)
+    _local.profile = None
+    if profile is not None:
+        profile.finish()
+    return profile
+
+
+def current() -> RequestProfile | None:
+    """Возвращает профиль текущего запроса или None, если профилирование выключено."""
+    return getattr(_local, 'profile', None)
+
+
+@contextmanager
+def stage(name: str):
+    """Учитывает время блока как этап профиля (без профиля ничего не делает)."""
+    profile = current()
+    if profile is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - start_time)
+
+
+def timed_callable(name: str, func: Callable | None) -> Callable | None:
+    """Оборачивает функцию, вызываемую для каждого элемента, накоплением времени этапа.
+
+    Без активного профиля возвращает функцию без изменений.
+    """
+    profile = current()
+    if profile is None or func is None:
+        return func
+
+    def wrapper(*args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.add(name, time.perf_counter() - start_time)
+    return wrapper
+
+
+class _TimedSource:
+    """Обертка репозитория, учитывающая время получения строк как этап fetch."""
+
+    def __init__(self, repository, profile: RequestProfile):
+        self._repository = repository
+        self._profile = profile
+
+    def __getattr__(self, name):
+        return getattr(self._repository, name)
+
+    def _timed(self, rows):
+        rows = iter(rows)
+        add = self._profile.add
+        while True:
+            start_time = time.perf_counter()
+            try:
+                row = next(rows)
+            except StopIteration:
+                add('fetch', time.perf_counter() - start_time)
+                return
+            add('fetch', time.perf_counter() - start_time)
+            yield row
+
+    def iter_rows(self, fields=None):
+        return self._timed(self._repository.iter_rows(fields))
+
+    def iter_teachers(self):
+        return self._timed(self._repository.iter_teachers())
+
+
+def timed_source(repository):
+    """Возвращает репозиторий, чтение строк из которого учитывается как этап fetch.
+
+    Без активного профиля возвращает репозиторий без изменений.
+    """
+    profile = current()
+    if profile is None:
+        return repository
+    return _TimedSource(repository, profile)
+
+
+# Наибольший срок действия подписи X-Profile в секундах: перехваченный
+# подписанный запрос нельзя повторять дольше
+MAX_SIGNATURE_AGE = 300
+
+
+def canonical_request(path: str, args) -> str:
+    """Возвращает подписываемую строку: путь и отсортированные параметры запроса.
+
+    args — MultiDict параметров Flask или последовательность пар (имя, значение).
+    """
+    items = args.items(multi=True) if hasattr(args, 'items') else args
+    return f"{path}?{urlencode(sorted(items))}"
+
+
+def sign(secret: str, path: str, args=(), expires: int | None = None) -> str:
+    """Возвращает значение заголовка X-Profile: «срок:подпись».
+
+    Подпись HMAC-SHA256 охватывает срок действия (Unix time), путь и
+    отсортированные параметры запроса.
+    """
+    if expires is None:
+        expires = int(time.time()) + MAX_SIGNATURE_AGE
+    message = f"{expires}\n{canonical_request(path, args)}"
+    digest = hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+    return f"{expires}:{digest}"
+
+
+def verify(secret: str | None, path: str, args, header: str | None) -> bool:
+    """Проверяет заголовок X-Profile; без секрета подписи не принимаются.
+
+    Подпись с истекшим сроком или сроком дальше MAX_SIGNATURE_AGE
+    отклоняется.
+    """
+    if not secret or not header:
+        return False
+    expires, _, _ = header.partition(':')
+    try:
+        expires = int(expires)
+    except ValueError:
+        return False
+    now = time.time()
+    if not now <= expires <= now + MAX_SIGNATURE_AGE:
+        return False
+    return hmac.compare_digest(sign(secret, path, args, expires), header)
+
+
+class ProfileStore:
+    """Ограниченное кольцо профилей на диске.
+
+    Для каждого профиля хранятся файл cProfile (<id>.prof) и описание с
+    разбивкой по этапам (<id>.json); при превышении size удаляются самые
+    старые профили.
+    """
+
+    def __init__(self, directory: str, size: int = 50):
+        self._directory = directory
+        self._size = size
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _ids(self) -> List[str]:
+        """Возвращает идентификаторы сохраненных профилей от старых к новым."""
+        return sorted(name[:-5] for name in os.listdir(self._directory) if name.endswith('.json'))
+
+    def path(self, profile_id: str) -> str | None:
+        """Возвращает путь к файлу cProfile или None, если профиля нет."""
+        if profile_id not in self._ids():
+            return None
+        return os.path.join(self._directory, f"{profile_id}.prof")
+
+    def save(self, profile: RequestProfile, **info) -> str:
+        """Сохраняет профиль и возвращает его идентификатор."""
+        profile_id = f"{time.time_ns():020d}"
+        base = os.path.join(self._directory, profile_id)
+        profile.profiler.dump_stats(base + ".prof")
+        meta = {
+            'id': profile_id,
+            'name': profile.name,
+            'started': profile.started,
+            'duration_sec': profile.duration,
+            'stages_sec': profile.breakdown(),
+            **info,
+        }
+        try:
+            with open(base + ".json", 'w', encoding='utf-8') as file:
+                json.dump(meta, file, ensure_ascii=False, indent=2)
+        except BaseException:
+            self._remove(profile_id)
+            raise
+
+        with self._lock:
+            # Кольцо считается по всем файлам, чтобы удалялись и файлы
+            # .prof, оставшиеся без описания
+            stored = sorted({name.rsplit('.', 1)[0] for name in os.listdir(self._directory)
+                             if name.endswith(('.json', '.prof'))})
+            for old_id in stored[:-self._size]:
+                self._remove(old_id)
+        return profile_id
+
+    def _remove(self, profile_id: str):
+        """Удаляет файлы профиля."""
+        for suffix in (".json", ".prof"):
+            try:
+                os.remove(os.path.join(self._directory, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+    def list(self) -> List[dict]:
+        """Возвращает описания профилей от новых к старым."""
+        result = []
+        for profile_id in reversed(self._ids()):
+            meta = self.get(profile_id, top=0)
+            if meta:
+                result.append(meta)
+        return result
+
+    def get(self, profile_id: str, top: int = 30) -> dict | None:
+        """Возвращает описание профиля и top самых затратных функций."""
+        if profile_id not in self._ids():
+            return None
+        base = os.path.join(self._directory, profile_id)
+        try:
+            with open(base + ".json", 'r', encoding='utf-8') as file:
+                meta = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if top:
+            output = io.StringIO()
+            stats = pstats.Stats(base + ".prof", stream=output)
+            stats.sort_stats('cumulative').print_stats(top)
+            meta['top_functions'] = output.getvalue()
+        return meta
@@ -0,0 +1,257 @@
+"""Учет выполняемых SQL-запросов и журнал медленных запросов."""
+from collections import deque
+from typing import Dict, List, NamedTuple
+import json
+import re
+import threading
+import time
+from .metrics import REGISTRY
+
+# Запросы, для которых безопасно выполнить EXPLAIN ANALYZE: он повторно
+# выполняет запрос, поэтому изменяющие данные выражения не разбираются.
+# Подготовленные выражения репозитория (EXECUTE) — только выборки.
+_READ_ONLY = re.compile(r"^\s*(SELECT|EXECUTE)\b", re.IGNORECASE)
+_EXECUTE_NAME = re.compile(r"^\s*(EXECUTE\s+\w+)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+# Литералы, которые драйвер подставляет в текст запроса (в том числе
+# execute_values): строки, включая E'...', и числа вне идентификаторов
+_LITERALS = re.compile(r"(?<![\w$])(?:[Ee]?'(?:[^']|'')*'|-?\d+(?:\.\d+)?(?:[Ee][+-]?\d+)?)(?![\w$])")
+_ROW = r"\((?:[^()]|\([^()]*\))*\)"
+_VALUES_LIST = re.compile(rf"\bVALUES\s*{_ROW}(?:\s*,\s*{_ROW})*", re.IGNORECASE)
+
+DEFAULT_MAX_ENTRIES = 100
+
+DB_QUERY_SECONDS = REGISTRY.histogram('teachers_db_query_duration_seconds',
+                                      "Длительность SQL-запросов")
+DB_SLOW_QUERIES = REGISTRY.counter('teachers_db_slow_queries_total',
+                                   "Число запросов дольше порога журнала медленных запросов")
+
+
+def _text(sql) -> str:
+    return sql.decode('utf-8', 'replace') if isinstance(sql, bytes) else str(sql)
+
+
+def statement_template(sql) -> str:
+    """Возвращает текст запроса без данных: литералы заменены на ?, список VALUES — на (...).
+
+    Пакетная вставка передает строки прямо в тексте запроса, поэтому без
+    замены каждый пакет давал бы отдельный ключ с персональными данными.
+    """
+    text = _LITERALS.sub("?", _text(sql))
+    text = _VALUES_LIST.sub("VALUES (...)", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def statement_key(sql) -> str:
+    """Возвращает текст запроса без параметров для группировки статистики.
+
+    Для подготовленных выражений ключ — «EXECUTE имя», для остальных —
+    шаблон запроса (см. statement_template).
+    """
+    match = _EXECUTE_NAME.match(_text(sql))
+    if match:
+        return _SPACES.sub(" ", match.group(1))
+    return statement_template(sql)
+
+
+class QueryRecord(NamedTuple):
+    """Выполненный запрос: длительность, число строк и размер отправленного текста.
+
+    query — шаблон запроса без значений параметров, чтобы журнал не
+    содержал персональных данных.
+    """
+    statement: str
+    query: str
+    duration: float
+    rows: int
+    bytes: int
+    timestamp: float
+    plan: str | None = None
+
+
+class StatementStats:
+    """Накопленная статистика одного выражения (по ключу statement_key)."""
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, record: QueryRecord):
+        self.calls += 1
+        self.total_time += record.duration
+        self.max_time = max(self.max_time, record.duration)
+        self.rows += record.rows
+        self.bytes += record.bytes
+
+    def as_dict(self) -> dict:
+        return {
+            'calls': self.calls,
+            'total_time': self.total_time,
+            'mean_time': self.total_time / self.calls if self.calls else 0.0,
+            'max_time': self.max_time,
+            'rows': self.rows,
+            'bytes': self.bytes
+        }
+
+
+class QueryLog:
+    """Статистика всех запросов и журнал запросов дольше threshold секунд.
+
+    Последние max_entries медленных запросов хранятся в памяти; если задан
+    filename, они дописываются в файл в формате JSON Lines. При explain=True
+    для медленных выборок сохраняется вывод EXPLAIN (ANALYZE, BUFFERS).
+    """
+
+    def __init__(self, threshold: float = 0.1, filename: str | None = None,
+                 explain: bool = False, max_entries: int = DEFAULT_MAX_ENTRIES):
+        if threshold < 0:
+            raise ValueError("Порог медленного запроса не может быть отрицательным")
+        self.threshold = threshold
+        self.explain = explain
+        self._filename = filename
+        self._slow = deque(maxlen=max_entries)
+        self._stats: Dict[str, StatementStats] = {}
+        self._lock = threading.Lock()
+
+    def is_slow(self, duration: float) -> bool:
+        """Проверяет, превышает ли длительность порог."""
+        return duration >= self.threshold
+
+    def record(self, record: QueryRecord):
+        """Учитывает выполненный запрос."""
+        if REGISTRY.enabled:
+            DB_QUERY_SECONDS.observe(record.duration)
+        slow = self.is_slow(record.duration)
+        with self._lock:
+            stats = self._stats.get(record.statement)
+            if stats is None:
+                stats = self._stats[record.statement] = StatementStats()
+            stats.add(record)
+            if slow:
+                self._slow.append(record)
+        if slow:
+            DB_SLOW_QUERIES.inc()
+            if self._filename:
+                line = json.dumps(record._asdict(), ensure_ascii=False) + "\n"
+                with self._lock, open(self._filename, 'a', encoding='utf-8') as file:
+                    file.write(line)
+
+    def slow_queries(self) -> List[QueryRecord]:
+        """Возвращает последние медленные запросы от старых к новым."""
+        with self._lock:
+            return list(self._slow)
+
+    def stats(self) -> Dict[str, dict]:
+        """Возвращает статистику выражений, отсортированную по суммарному времени."""
+        with self._lock:
+            items = [(key, stats.as_dict()) for key, stats in self._stats.items()]
+        return dict(sorted(items, key=lambda item: item[1]['total_time'], reverse=True))
+
+    def reset(self):
+        """Очищает статистику и журнал в памяти."""
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+
+class InstrumentedCursor:
+    """Обертка курсора DB-API, учитывающая каждый запрос в QueryLog.
+
+    Для обычного курсора время — это execute (psycopg2 получает весь
+    результат при выполнении), строки — rowcount. Для именованного
+    (серверного) курсора запрос выполняется при чтении, поэтому он
+    учитывается после прохода по результату: время — суммарное ожидание
+    строк, строки — число прочитанных.
+    """
+
+    def __init__(self, cursor, log: QueryLog):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_log', log)
+        object.__setattr__(self, '_pending', None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        # itersize и другие настройки относятся к обернутому курсору
+        setattr(self._cursor, name, value)
+
+    def __enter__(self):
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._cursor.__exit__(*exc_info)
+
+    def __iter__(self):
+        if self._pending is None:
+            yield from self._cursor
+            return
+        sql, params = self._pending
+        object.__setattr__(self, '_pending', None)
+        rows = iter(self._cursor)
+        duration, count = 0.0, 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    row = next(rows)
+                except StopIteration:
+                    duration += time.perf_counter() - start
+                    return
+                duration += time.perf_counter() - start
+                count += 1
+                yield row
+        finally:
+            # Учитывается и чтение, прерванное потребителем
+            self._record(sql, params, duration, count)
+
+    def execute(self, sql, params=None):
+        """Выполняет запрос и учитывает его."""
+        if getattr(self._cursor, 'name', None):
+            # Серверный курсор: учет после чтения результата в __iter__
+            result = self._cursor.execute(sql, params)
+            object.__setattr__(self, '_pending', (sql, params))
+            return result
+        start = time.perf_counter()
+        result = self._cursor.execute(sql, params)
+        duration = time.perf_counter() - start
+        rows = self._cursor.rowcount
+        self._record(sql, params, duration, rows if rows is not None and rows >= 0 else 0)
+        return result
+
+    def _record(self, sql, params, duration: float, rows: int):
+        # Отправленный текст с параметрами учитывается только по размеру
+        query = getattr(self._cursor, 'query', None) or sql
+        plan = None
+        if self._log.explain and self._log.is_slow(duration) and _READ_ONLY.match(_text(sql)):
+            plan = self._explain(sql, params)
+        self._log.record(QueryRecord(statement_key(sql), statement_template(sql), duration, rows,
+                                     len(query.encode('utf-8') if isinstance(query, str) else query),
+                                     time.time(), plan))
+
+    def _explain(self, sql, params) -> str | None:
+        """Возвращает план запроса с фактическими затратами.
+
+        EXPLAIN выполняется в точке сохранения, чтобы его ошибка не
+        прерывала транзакцию репозитория.
+        """
+        cursor = self._cursor.connection.cursor()
+        try:
+            cursor.execute("SAVEPOINT explain_slow_query")
+            try:
+                cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {_text(sql)}", params)
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+            except Exception as e:
+                cursor.execute("ROLLBACK TO SAVEPOINT explain_slow_query")
+                plan = f"EXPLAIN не выполнен: {e}"
+            cursor.execute("RELEASE SAVEPOINT explain_slow_query")
+            return plan
+        except Exception as e:
+            print(f"Ошибка получения плана запроса: {e}")
+            return None
+        finally:
+            cursor.close()
@@ -1,9 +1,227 @@
 """Модуль для работы с репозиториями преподавателей."""
-from typing import List, Callable
+from typing import List, Callable, Iterable, Iterator
+from collections import Counter, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from itertools import count, islice
+from operator import attrgetter
+import bisect
+import heapq
 import json
-import yaml
-import psycopg2
-from .teacher import Teacher
+import os
+import threading
+import time
+from .teacher import Teacher, TeacherSnapshot
+from .snils import Snils
+from .parser import TeacherParser, RowError
+from .events import ChangeFeed, ADDED, UPDATED, DELETED
+from .metrics import REGISTRY, instrument
+from .querylog import QueryLog, InstrumentedCursor
+from .storage import atomic_write, load_with_recovery
+from .codecs import AUTO, get_codec
+from .persistence import SaveScheduler
+
+_TEACHER_COLUMN_NAMES = (
+    'teacher_id', 'last_name', 'first_name', 'patronymic', 'academic_degree',
+    'administrative_position', 'experience_years', 'snils'
+)
+_TEACHER_COLUMNS = ", ".join(_TEACHER_COLUMN_NAMES)
+
+# Поля, доступные для проекции при чтении (совпадают со столбцами таблицы)
+TEACHER_FIELDS = _TEACHER_COLUMN_NAMES
+# Поля краткой информации о преподавателе (см. Teacher.short_info)
+SHORT_INFO_FIELDS = ('teacher_id', 'last_name', 'first_name', 'patronymic', 'experience_years')
+
+
+@lru_cache(maxsize=None)
+def row_type(fields: tuple) -> type:
+    """Возвращает именованный кортеж TeacherRow для проекции полей."""
+    if not fields:
+        raise ValueError("Проекция должна содержать хотя бы одно поле")
+    unknown = [name for name in fields if name not in TEACHER_FIELDS]
+    if unknown:
+        raise ValueError(f"Неизвестные поля: {', '.join(unknown)}")
+    return namedtuple('TeacherRow', fields)
+
+
+@lru_cache(maxsize=None)
+def _projector(fields: tuple) -> Callable:
+    """Возвращает функцию, строящую TeacherRow из полей преподавателя."""
+    make = row_type(fields)._make
+    getters = [attrgetter(name) for name in fields]
+    return lambda teacher: make([getter(teacher) for getter in getters])
+
+
+def _row_builder(fields) -> Callable:
+    """Снимок целиком без проекции или TeacherRow с выбранными полями."""
+    if fields is None:
+        return Teacher.snapshot
+    return _projector(tuple(fields))
+
+
+def _columns(alias: str) -> str:
+    """Возвращает список столбцов таблицы с префиксом псевдонима."""
+    return ", ".join(f"{alias}.{name}" for name in _TEACHER_COLUMN_NAMES)
+
+# Часто выполняемые запросы, подготавливаемые один раз на соединение
+_PREPARED_STATEMENTS = {
+    'teacher_by_id': f"SELECT {_TEACHER_COLUMNS} FROM teachers WHERE teacher_id = $1",
+    'teacher_by_snils': f"SELECT {_TEACHER_COLUMNS} FROM teachers WHERE snils = $1",
+    'teachers_page': (f"SELECT {_TEACHER_COLUMNS} FROM teachers "
+                      f"ORDER BY teacher_id LIMIT $1 OFFSET $2"),
+    'teachers_count': "SELECT COUNT(*) FROM teachers",
+    'teachers_version': ("SELECT version, EXTRACT(EPOCH FROM updated_at)::float8 "
+                         "FROM teachers_version"),
+}
+
+
+# Ключи потокового упорядочивания; СНИЛС сравнивается побайтно, как строки в Python
+_ORDER_BY = {
+    'teacher_id': 'teacher_id',
+    'snils': 'snils COLLATE "C"',
+}
+
+
+def _page(rows: Iterable, k: int, n: int) -> list:
+    """Возвращает n-ю страницу по k элементов (пустую за пределами данных)."""
+    start = (n - 1) * k
+    return list(islice(rows, start, start + k))
+
+
+def _paginate(teachers, k: int, n: int) -> List[Teacher]:
+    """Возвращает n-ю страницу по k преподавателей из итератора.
+
+    В отличие от _page, за пределами данных выбрасывает IndexError.
+    """
+    start_index = (n - 1) * k
+    result = list(islice(teachers, start_index, start_index + k))
+    if not result:
+        raise IndexError("start index out of range")
+    return result
+
+
+# Нижние границы интервалов стажа для статистики
+EXPERIENCE_BUCKETS = (0, 5, 10, 20, 30)
+NOT_SPECIFIED = "Не указано"
+
+
+def _bucket_label(index: int) -> str:
+    """Возвращает подпись интервала стажа по его номеру."""
+    low = EXPERIENCE_BUCKETS[index]
+    if index + 1 < len(EXPERIENCE_BUCKETS):
+        return f"{low}-{EXPERIENCE_BUCKETS[index + 1] - 1}"
+    return f"{low}+"
+
+
+def experience_bucket(experience_years: int) -> str:
+    """Возвращает подпись интервала, в который попадает стаж."""
+    index = bisect.bisect_right(EXPERIENCE_BUCKETS, experience_years) - 1
+    return _bucket_label(max(index, 0))
+
+
+class TeacherStats:
+    """Счетчики преподавателей по ученой степени, должности и стажу."""
+
+    def __init__(self, teachers=()):
+        """Инициализирует счетчики по списку преподавателей."""
+        self._total = 0
+        self._degrees = Counter()
+        self._positions = Counter()
+        self._experience = Counter()
+        for teacher in teachers:
+            self.add(teacher)
+
+    def add(self, teacher: Teacher):
+        """Учитывает преподавателя в счетчиках."""
+        self._total += 1
+        self._degrees[teacher.academic_degree or NOT_SPECIFIED] += 1
+        self._positions[teacher.administrative_position or NOT_SPECIFIED] += 1
+        self._experience[experience_bucket(teacher.experience_years)] += 1
+
+    def remove(self, teacher: Teacher):
+        """Исключает преподавателя из счетчиков."""
+        self._total -= 1
+        for counter, key in ((self._degrees, teacher.academic_degree or NOT_SPECIFIED),
+                             (self._positions, teacher.administrative_position or NOT_SPECIFIED),
+                             (self._experience, experience_bucket(teacher.experience_years))):
+            counter[key] -= 1
+            if counter[key] <= 0:
+                del counter[key]
+
+    def as_dict(self) -> dict:
+        """Возвращает статистику в виде словаря."""
+        return _stats_dict(self._total, self._degrees, self._positions, self._experience)
+
+
+def _stats_dict(total: int, degrees, positions, experience) -> dict:
+    """Собирает словарь статистики в едином формате для всех репозиториев."""
+    buckets = {_bucket_label(i): 0 for i in range(len(EXPERIENCE_BUCKETS))}
+    buckets.update(experience)
+    return {
+        'total': total,
+        'academic_degree': dict(sorted(degrees.items())),
+        'administrative_position': dict(sorted(positions.items())),
+        'experience_years': buckets
+    }
+
+
+def _read_records(load: Callable) -> Callable:
+    """Возвращает функцию чтения файла, проверяющую, что в нем список записей."""
+    def read(file):
+        data = load(file)
+        if not isinstance(data, list):
+            raise ValueError("ожидается список преподавателей")
+        return data
+    return read
+
+
+def _teacher_record(teacher: Teacher) -> dict:
+    """Возвращает запись преподавателя для сохранения в файл."""
+    return {
+        'teacher_id': teacher.teacher_id,
+        'last_name': teacher.last_name,
+        'first_name': teacher.first_name,
+        'patronymic': teacher.patronymic,
+        'academic_degree': teacher.academic_degree,
+        'administrative_position': teacher.administrative_position,
+        'experience_years': teacher.experience_years,
+        'snils': teacher.snils
+    }
+
+
+def _collect_teachers(results) -> List[Teacher]:
+    """Собирает преподавателей из результатов разбора, сообщая об ошибках."""
+    teachers = []
+    for result in results:
+        if isinstance(result, RowError):
+            print(f"Ошибка при создании преподавателя: {result.error}")
+        else:
+            teachers.append(result)
+    return teachers
+
+
+DB_CONNECTIONS_OPENED = REGISTRY.counter('teachers_db_connections_opened_total',
+                                         "Число открытых соединений с БД")
+DB_TRANSACTIONS = REGISTRY.counter('teachers_db_transactions_total',
+                                   "Число транзакций БД по результату", ('result',))
+
+# Поколения берутся из общего счетчика, поэтому не повторяются
+# у разных репозиториев одного процесса
+_generations = count(1)
+
+
+def _locked(method):
+    """Выполняет метод под блокировкой записи репозитория.
+
+    Изменения, сохранение и transaction() исключают друг друга, поэтому
+    запись другого потока не попадает в чужую транзакцию и не теряется
+    при ее откате, а фоновое сохранение не пишет файл посреди транзакции.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
 
 
 class TeacherRepository:
@@ -12,6 +230,79 @@ class TeacherRepository:
     def __init__(self):
         """Инициализирует репозиторий."""
         self._teachers: List[Teacher] = []
+        self._by_id: dict[int, Teacher] = {}
+        self._by_snils: dict[Snils, Teacher] = {}
+        self._stats = TeacherStats()
+        self._in_transaction = False
+        # Повторно входимая: transaction() вызывает изменения и сохранение в том же потоке
+        self._write_lock = threading.RLock()
+        self._change_feed: ChangeFeed | None = None
+        self._pending_changes: list = []
+        # Изменения вне транзакции, ждущие сохранения; публикуются после него
+        self._unsaved_changes: list = []
+        self._changes_lock = threading.Lock()
+        self._save_scheduler: SaveScheduler | None = None
+        self._touch()
+
+    def _touch(self):
+        """Отмечает изменение данных новым поколением."""
+        self._generation = next(_generations)
+        self._last_modified = time.time()
+
+    @property
+    def generation(self) -> int:
+        """Возвращает поколение данных, меняющееся при каждом изменении."""
+        return self._generation
+
+    @property
+    def last_modified(self) -> float:
+        """Возвращает время последнего изменения данных (Unix time)."""
+        return self._last_modified
+
+    def version(self) -> tuple[int, float]:
+        """Возвращает согласованные поколение и время последнего изменения."""
+        return self._generation, self._last_modified
+
+    def set_change_feed(self, feed: ChangeFeed | None):
+        """Подключает поток событий изменения данных."""
+        self._change_feed = feed
+
+    def _record_change(self, kind: str, before: Teacher | None, after: Teacher | None):
+        """Фиксирует изменение для потока событий.
+
+        События публикуются только после успешного сохранения (persist() или
+        выхода из transaction()); внутри транзакции при откате они отбрасываются.
+        """
+        self._touch()
+        if self._change_feed is None:
+            return
+        change = (kind, before.snapshot() if before else None,
+                  after.snapshot() if after else None)
+        if self._in_transaction:
+            self._pending_changes.append(change)
+        else:
+            with self._changes_lock:
+                self._unsaved_changes.append(change)
+
+    def _save_and_publish(self):
+        """Сохраняет данные и публикует изменения, вошедшие в сохранение."""
+        with self._changes_lock:
+            changes, self._unsaved_changes = self._unsaved_changes, []
+        try:
+            self.save_to_file()
+        except BaseException:
+            with self._changes_lock:
+                self._unsaved_changes[:0] = changes
+            raise
+        if changes and self._change_feed is not None:
+            self._change_feed.publish(changes)
+
+    def _rebuild_index(self):
+        """Перестраивает индексы по ID и СНИЛС и счетчики статистики."""
+        self._by_id = {teacher.teacher_id: teacher for teacher in self._teachers}
+        self._by_snils = {teacher.snils_value: teacher for teacher in self._teachers}
+        self._stats = TeacherStats(self._teachers)
+        self._touch()
 
     def _load_from_file(self):
         """Загружает данные из файла."""
@@ -19,26 +310,122 @@ class TeacherRepository:
     def save_to_file(self):
         """Сохраняет данные в файл."""
 
+    def schedule_saves(self, delay: float, max_pending: int):
+        """Включает отложенное сохранение: persist() сохраняет не сразу.
+
+        Изменения записываются в файл не позже чем через delay секунд или
+        после max_pending изменений (см. SaveScheduler).
+        """
+        self._save_scheduler = SaveScheduler(self._save_and_publish, delay, max_pending)
+
+    def persist(self):
+        """Сохраняет изменения сразу или планирует сохранение."""
+        if self._save_scheduler is None:
+            self._save_and_publish()
+        else:
+            self._save_scheduler.mark_dirty()
+
+    def flush(self):
+        """Немедленно сохраняет запланированные изменения."""
+        if self._save_scheduler is not None:
+            self._save_scheduler.flush()
+
+    def close(self):
+        """Сохраняет изменения и останавливает отложенное сохранение.
+
+        Вызывается, когда репозиторий заменяется другим или больше не нужен.
+        """
+        if self._save_scheduler is not None:
+            scheduler, self._save_scheduler = self._save_scheduler, None
+            scheduler.close()
+
+    @contextmanager
+    def transaction(self):
+        """Объединяет несколько изменений в одну единицу работы.
+
+        Внутри блока save_to_file не пишет файл: данные сохраняются один раз
+        при успешном выходе, а при исключении список преподавателей
+        возвращается в исходное состояние. На время блока изменения и
+        сохранения из других потоков ждут его завершения.
+        """
+        # Блокировка берется до проверки флага: другой поток ждет конца транзакции
+        with self._write_lock:
+            if self._in_transaction:
+                yield self
+                return
+
+            snapshot = list(self._teachers)
+            self._in_transaction = True
+            self._pending_changes = []
+            try:
+                yield self
+            except BaseException:
+                self._teachers = snapshot
+                self._rebuild_index()
+                raise
+            finally:
+                self._in_transaction = False
+
+            # Сохранение включает и изменения, сделанные до транзакции
+            with self._changes_lock:
+                earlier, self._unsaved_changes = self._unsaved_changes, []
+            try:
+                self.save_to_file()
+            except Exception:
+                with self._changes_lock:
+                    self._unsaved_changes[:0] = earlier
+                self._teachers = snapshot
+                self._rebuild_index()
+                raise
+            finally:
+                changes, self._pending_changes = self._pending_changes, []
+
+        if self._change_feed is not None:
+            self._change_feed.publish(earlier + changes)
+
     def get_by_id(self, teacher_id: int) -> Teacher | None:
         """Возвращает преподавателя по ID."""
-        for teacher in self._teachers:
-            if teacher.teacher_id == teacher_id:
-                return teacher
-        return None
+        return self._by_id.get(teacher_id)
+
+    def get_many(self, teacher_ids) -> List[Teacher]:
+        """Возвращает найденных преподавателей в порядке переданных ID."""
+        return [self._by_id[teacher_id] for teacher_id in teacher_ids
+                if teacher_id in self._by_id]
 
     def get_by_snils(self, snils: str) -> Teacher | None:
         """Возвращает преподавателя по СНИЛС."""
-        if not snils:
+        key = Snils.try_parse(snils)
+        if key is None:
             return None
+        return self._by_snils.get(key)
 
-        # Очищаем SNILS для сравнения (убираем дефисы и пробелы)
-        import re
-        clean_snils = re.sub(r'\D', '', snils.strip())
+    def iter_teachers(self) -> Iterator[Teacher]:
+        """Последовательно возвращает всех преподавателей."""
+        return iter(self._teachers)
 
-        for teacher in self._teachers:
-            if teacher.snils == clean_snils:
-                return teacher
-        return None
+    def get_row(self, teacher_id: int, fields=None):
+        """Возвращает строку преподавателя по ID.
+
+        Без fields возвращается TeacherSnapshot, с fields — TeacherRow
+        только с перечисленными полями.
+        """
+        teacher = self._by_id.get(teacher_id)
+        return _row_builder(fields)(teacher) if teacher else None
+
+    def iter_rows(self, fields=None) -> Iterator:
+        """Последовательно возвращает строки преподавателей для сериализации."""
+        return map(_row_builder(fields), self._teachers)
+
+    def get_rows_page(self, k: int, n: int, fields=None) -> list:
+        """Возвращает страницу строк преподавателей (пустую за пределами данных)."""
+        start = (n - 1) * k
+        return list(map(_row_builder(fields), self._teachers[start:start + k]))
+
+    def iter_sorted(self, key: str = 'teacher_id') -> Iterator[Teacher]:
+        """Возвращает преподавателей, упорядоченных по teacher_id или snils."""
+        if key not in _ORDER_BY:
+            raise ValueError(f"Недопустимый ключ упорядочивания: {key}")
+        return iter(sorted(self._teachers, key=attrgetter(key)))
 
     def get_k_n_short_list(self, k: int, n: int) -> List[Teacher]:
         """Возвращает список преподавателей с пагинацией."""
@@ -68,8 +455,11 @@ class TeacherRepository:
             raise ValueError(f"Недопустимое поле для сортировки: {field}")
 
         self._teachers.sort(key=valid_fields[field])
+        # Порядок влияет на постраничный вывод
+        self._touch()
         return self._teachers.copy()
 
+    @_locked
     def add_teacher(self, teacher_data: dict) -> Teacher:
         """Добавляет нового преподавателя."""
         if self._teachers:
@@ -88,15 +478,38 @@ class TeacherRepository:
             snils=teacher_data.get('snils')
         )
 
-        # Проверка уникальности СНИЛС используя __eq__
-        for existing_teacher in self._teachers:
-            if existing_teacher == teacher:
-                msg = f"Преподаватель с СНИЛС {teacher_data.get('snils')} уже существует"
-                raise ValueError(msg)
+        # Проверка уникальности СНИЛС по хэш-индексу
+        if teacher.snils_value in self._by_snils:
+            msg = f"Преподаватель с СНИЛС {teacher_data.get('snils')} уже существует"
+            raise ValueError(msg)
 
         self._teachers.append(teacher)
+        self._by_id[new_id] = teacher
+        self._by_snils[teacher.snils_value] = teacher
+        self._stats.add(teacher)
+        self._record_change(ADDED, None, teacher)
         return teacher
 
+    @_locked
+    def add_teachers(self, teachers: Iterable[Teacher]) -> List[Teacher]:
+        """Добавляет уже проверенных преподавателей, сохраняя их ID.
+
+        Преподаватели с занятым ID или СНИЛС не добавляются и возвращаются
+        списком отклоненных.
+        """
+        rejected = []
+        for teacher in teachers:
+            if teacher.teacher_id in self._by_id or teacher.snils_value in self._by_snils:
+                rejected.append(teacher)
+                continue
+            self._teachers.append(teacher)
+            self._by_id[teacher.teacher_id] = teacher
+            self._by_snils[teacher.snils_value] = teacher
+            self._stats.add(teacher)
+            self._record_change(ADDED, None, teacher)
+        return rejected
+
+    @_locked
     def update_teacher(self, teacher_id: int, teacher_data: dict) -> Teacher | None:
         """Обновляет данные преподавателя."""
         for i, teacher in enumerate(self._teachers):
@@ -110,15 +523,14 @@ class TeacherRepository:
                     academic_degree=teacher_data.get('academic_degree'),
                     administrative_position=teacher_data.get('administrative_position'),
                     experience_years=teacher_data.get('experience_years', 0),
-                    snils=teacher.snils  # Используем текущий СНИЛС
+                    snils=teacher.snils_value  # Используем текущий, уже проверенный СНИЛС
                 )
 
                 # Проверка уникальности СНИЛС (кроме текущего преподавателя)
-                for existing_teacher in self._teachers:
-                    if (existing_teacher.teacher_id != teacher_id and
-                            existing_teacher == temp_teacher):
-                        msg = f"Преподаватель с СНИЛС {teacher.snils} уже существует"
-                        raise ValueError(msg)
+                existing_teacher = self._by_snils.get(temp_teacher.snils_value)
+                if existing_teacher is not None and existing_teacher.teacher_id != teacher_id:
+                    msg = f"Преподаватель с СНИЛС {teacher.snils} уже существует"
+                    raise ValueError(msg)
 
                 updated_teacher = Teacher(
                     teacher_id=teacher_id,
@@ -128,20 +540,87 @@ class TeacherRepository:
                     academic_degree=teacher_data.get('academic_degree'),
                     administrative_position=teacher_data.get('administrative_position'),
                     experience_years=teacher_data.get('experience_years', 0),
-                    snils=teacher.snils  # Сохраняем оригинальный СНИЛС
+                    snils=teacher.snils_value  # Сохраняем оригинальный СНИЛС
                 )
                 self._teachers[i] = updated_teacher
+                self._by_id[teacher_id] = updated_teacher
+                self._by_snils[updated_teacher.snils_value] = updated_teacher
+                self._stats.remove(teacher)
+                self._stats.add(updated_teacher)
+                self._record_change(UPDATED, teacher, updated_teacher)
                 return updated_teacher
         return None
 
+    @_locked
+    def update_many(self, updates: Iterable[tuple[int, dict]]) -> int:
+        """Обновляет преподавателей по парам (ID, данные) за один проход по списку.
+
+        СНИЛС не изменяется; отсутствующие ID пропускаются. Возвращает
+        количество обновленных записей.
+        """
+        updated = {}
+        for teacher_id, teacher_data in updates:
+            teacher = self._by_id.get(teacher_id)
+            if teacher is None:
+                continue
+            updated_teacher = Teacher(
+                teacher_id=teacher_id,
+                last_name=teacher_data['last_name'],
+                first_name=teacher_data['first_name'],
+                patronymic=teacher_data.get('patronymic'),
+                academic_degree=teacher_data.get('academic_degree'),
+                administrative_position=teacher_data.get('administrative_position'),
+                experience_years=teacher_data.get('experience_years', 0),
+                snils=teacher.snils_value
+            )
+            self._by_id[teacher_id] = updated_teacher
+            self._by_snils[updated_teacher.snils_value] = updated_teacher
+            self._stats.remove(teacher)
+            self._stats.add(updated_teacher)
+            self._record_change(UPDATED, teacher, updated_teacher)
+            updated[teacher_id] = updated_teacher
+        if updated:
+            self._teachers = [updated.get(t.teacher_id, t) for t in self._teachers]
+        return len(updated)
+
+    @_locked
     def delete_teacher(self, teacher_id: int) -> bool:
         """Удаляет преподавателя по ID."""
         for i, teacher in enumerate(self._teachers):
             if teacher.teacher_id == teacher_id:
                 del self._teachers[i]
+                del self._by_id[teacher_id]
+                del self._by_snils[teacher.snils_value]
+                self._stats.remove(teacher)
+                self._record_change(DELETED, teacher, None)
                 return True
         return False
 
+    @_locked
+    def delete_many(self, teacher_ids) -> int:
+        """Удаляет преподавателей по списку ID за один проход.
+
+        Возвращает количество удаленных записей.
+        """
+        ids = {teacher_id for teacher_id in teacher_ids if teacher_id in self._by_id}
+        if not ids:
+            return 0
+        self._teachers = [t for t in self._teachers if t.teacher_id not in ids]
+        for teacher_id in ids:
+            teacher = self._by_id.pop(teacher_id)
+            del self._by_snils[teacher.snils_value]
+            self._stats.remove(teacher)
+            self._record_change(DELETED, teacher, None)
+        return len(ids)
+
+    def aggregate(self) -> dict:
+        """Возвращает статистику по ученой степени, должности и стажу.
+
+        Счетчики поддерживаются при каждом изменении, поэтому вызов не
+        просматривает список преподавателей.
+        """
+        return self._stats.as_dict()
+
     def get_count(self) -> int:
         """Возвращает количество преподавателей."""
         return len(self._teachers)
@@ -150,133 +629,277 @@ class TeacherRepository:
 class TeacherRepJson(TeacherRepository):
     """Реализация репозитория для JSON формата."""
 
-    def __init__(self, filename: str):
-        """Инициализирует JSON репозиторий."""
+    def __init__(self, filename: str, backups: int = 0, fsync: bool = True,
+                 codec: str = AUTO, compact: bool = False):
+        """Инициализирует JSON репозиторий.
+
+        backups — число хранимых предыдущих версий файла, fsync — сброс
+        данных на диск при каждом сохранении, codec — имя кодека JSON
+        (см. models.codecs), compact — запись без отступов.
+        """
         super().__init__()
         self._filename = filename
+        self._backups = backups
+        self._fsync = fsync
+        self._codec = get_codec('json', codec)
+        self._compact = compact
         self._load_from_file()
 
     def _load_from_file(self):
-        """Загружает данные из JSON файла."""
+        """Загружает данные из JSON файла (из резервной копии, если он поврежден)."""
+        data = load_with_recovery(self._filename, _read_records(self._codec.load), (ValueError,),
+                                  self._backups)
+        self._teachers = _collect_teachers(TeacherParser.parse_records(data or []))
+        self._rebuild_index()
+
+    @_locked
+    def save_to_file(self):
+        """Сохраняет данные в JSON файл."""
+        if self._in_transaction:
+            return
+
+        # Копия списка: сохранение может выполняться в фоновом потоке
+        data = [_teacher_record(teacher) for teacher in list(self._teachers)]
+
+        atomic_write(self._filename, lambda file: self._codec.dump(data, file, self._compact),
+                     self._fsync, self._backups)
+
+
+SHARD_HASH = 'hash'
+SHARD_RANGE = 'range'
+SHARD_MANIFEST = 'manifest.json'
+_MANIFEST_VERSION = 1
+
+
+def _load_shard(filename: str, codec: str, backups: int) -> list:
+    """Читает и разбирает один шард (выполняется в потоке или рабочем процессе)."""
+    data = load_with_recovery(filename, _read_records(get_codec('json', codec).load),
+                              (ValueError,), backups)
+    return list(TeacherParser.parse_records(data or []))
+
+
+class TeacherRepJsonSharded(TeacherRepository):
+    """JSON репозиторий, разделенный на несколько файлов (шардов).
+
+    Преподаватели распределяются по шардам по остатку от деления ID
+    (SHARD_HASH, shards файлов) или по диапазонам ID из range_size
+    записей (SHARD_RANGE). Список файлов и способ разбиения хранятся
+    в manifest.json. При сохранении перезаписываются только шарды с
+    изменениями; каждый файл записывается атомарно, но набор шардов
+    целиком — нет. При загрузке шарды читаются параллельно в потоках
+    или процессах (executor='process'). Если параметры разбиения
+    изменились, данные перераспределяются при следующем сохранении.
+    """
+
+    def __init__(self, directory: str, shards: int = 8, partition: str = SHARD_HASH,
+                 range_size: int = 10000, backups: int = 0, fsync: bool = True,
+                 codec: str = AUTO, compact: bool = False, workers: int | None = None,
+                 executor: str = 'thread', legacy_filename: str | None = None):
+        """Инициализирует репозиторий в каталоге directory.
+
+        legacy_filename — JSON файл, из которого данные переносятся, если
+        шардов еще нет. Остальные параметры — как у TeacherRepJson.
+        """
+        super().__init__()
+        if partition not in (SHARD_HASH, SHARD_RANGE):
+            raise ValueError(f"Недопустимый способ разбиения: {partition}")
+        if shards < 1 or range_size < 1:
+            raise ValueError("Число шардов и размер диапазона должны быть положительными")
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"Недопустимый исполнитель: {executor}")
+        self._directory = directory
+        self._layout = {'partition': partition, 'shards': shards, 'range_size': range_size}
+        self._backups = backups
+        self._fsync = fsync
+        self._codec = get_codec('json', codec)
+        self._compact = compact
+        self._workers = workers
+        self._executor = executor
+        self._legacy_filename = legacy_filename
+        self._dirty: set[int] = set()
+        self._shard_keys: set[int] = set()
+        self._manifest_stale = False
+        self._dirty_lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._load_from_file()
+
+    def _shard_key(self, teacher_id: int) -> int:
+        """Возвращает номер шарда преподавателя."""
+        if self._layout['partition'] == SHARD_HASH:
+            return teacher_id % self._layout['shards']
+        return (teacher_id - 1) // self._layout['range_size']
+
+    def _shard_path(self, key: int) -> str:
+        return os.path.join(self._directory, f"shard-{key:04d}.json")
+
+    def _record_change(self, kind: str, before: Teacher | None, after: Teacher | None):
+        """Отмечает шард измененного преподавателя для сохранения."""
+        with self._dirty_lock:
+            self._dirty.add(self._shard_key((after or before).teacher_id))
+        super()._record_change(kind, before, after)
+
+    def _read_manifest(self) -> dict | None:
         try:
-            with open(self._filename, 'r', encoding='utf-8') as file:
-                data = json.load(file)
-                self._teachers = []
-                for item in data:
-                    try:
-                        teacher = Teacher(
-                            teacher_id=item['teacher_id'],
-                            last_name=item['last_name'],
-                            first_name=item['first_name'],
-                            patronymic=item.get('patronymic'),
-                            academic_degree=item.get('academic_degree'),
-                            administrative_position=item.get('administrative_position'),
-                            experience_years=item.get('experience_years', 0),
-                            snils=item.get('snils')
-                        )
-                        self._teachers.append(teacher)
-                    except (ValueError, KeyError) as e:
-                        print(f"Ошибка при создании преподавателя: {e}")
+            with open(os.path.join(self._directory, SHARD_MANIFEST), 'r', encoding='utf-8') as file:
+                return json.load(file)
         except FileNotFoundError:
-            self._teachers = []
-        except json.JSONDecodeError:
-            print(f"Ошибка чтения файла {self._filename}")
-            self._teachers = []
+            return None
+        except ValueError as e:
+            print(f"Манифест шардов {self._directory} поврежден: {e}")
+            return None
+
+    def _load_shards(self, files: List[str]) -> list:
+        """Читает шарды параллельно и возвращает результаты разбора по порядку."""
+        if len(files) <= 1 or self._workers == 1:
+            return [_load_shard(name, self._codec.name, self._backups) for name in files]
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        pool_class = ProcessPoolExecutor if self._executor == 'process' else ThreadPoolExecutor
+        workers = min(len(files), self._workers or os.cpu_count() or 1)
+        with pool_class(max_workers=workers) as pool:
+            return list(pool.map(_load_shard, files, [self._codec.name] * len(files),
+                                 [self._backups] * len(files)))
 
+    def _load_from_file(self):
+        """Загружает все шарды; при их отсутствии переносит данные из legacy_filename."""
+        manifest = self._read_manifest()
+        if manifest is not None:
+            files = [os.path.join(self._directory, name) for name in manifest['files']]
+            layout = {name: manifest.get(name) for name in self._layout}
+        else:
+            # Без манифеста читаются найденные шарды, а манифест создается заново
+            files = sorted(os.path.join(self._directory, name) for name in os.listdir(self._directory)
+                           if name.startswith('shard-') and name.endswith('.json'))
+            layout = None
+
+        results = [result for shard in self._load_shards(files) for result in shard]
+        if not files and self._legacy_filename:
+            data = load_with_recovery(self._legacy_filename, _read_records(self._codec.load),
+                                      (ValueError,), self._backups)
+            results = TeacherParser.parse_records(data or [])
+        # После сбоя при перераспределении преподаватель может оказаться
+        # в двух шардах; остается одна запись
+        by_id = {teacher.teacher_id: teacher for teacher in _collect_teachers(results)}
+        self._teachers = sorted(by_id.values(), key=attrgetter('teacher_id'))
+        self._rebuild_index()
+
+        self._dirty = set()
+        self._shard_keys = {self._shard_key(teacher.teacher_id) for teacher in self._teachers}
+        self._manifest_stale = layout != self._layout
+        if self._manifest_stale:
+            # Разбиение изменилось (или данные перенесены): переписываются все шарды
+            self._dirty = set(self._shard_keys)
+            try:
+                self.save_to_file()
+            except OSError as e:
+                print(f"Ошибка записи шардов {self._directory}: {e}")
+
+    @_locked
     def save_to_file(self):
-        """Сохраняет данные в JSON файл."""
-        data = []
-        for teacher in self._teachers:
-            teacher_data = {
-                'teacher_id': teacher.teacher_id,
-                'last_name': teacher.last_name,
-                'first_name': teacher.first_name,
-                'patronymic': teacher.patronymic,
-                'academic_degree': teacher.academic_degree,
-                'administrative_position': teacher.administrative_position,
-                'experience_years': teacher.experience_years,
-                'snils': teacher.snils
-            }
-            data.append(teacher_data)
-
-        with open(self._filename, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        """Сохраняет шарды с изменениями и при необходимости манифест."""
+        if self._in_transaction:
+            return
+
+        with self._save_lock:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, set()
+            if not dirty and not self._manifest_stale:
+                return
+            groups = {key: [] for key in dirty}
+            # Копия списка: сохранение может выполняться в фоновом потоке
+            for teacher in list(self._teachers):
+                group = groups.get(self._shard_key(teacher.teacher_id))
+                if group is not None:
+                    group.append(_teacher_record(teacher))
+
+            try:
+                for key, data in groups.items():
+                    if data:
+                        atomic_write(self._shard_path(key),
+                                     lambda file, data=data: self._codec.dump(data, file, self._compact),
+                                     self._fsync, self._backups)
+                    if data and key not in self._shard_keys:
+                        self._shard_keys.add(key)
+                        self._manifest_stale = True
+                    elif not data and key in self._shard_keys:
+                        self._shard_keys.discard(key)
+                        self._manifest_stale = True
+                if self._manifest_stale:
+                    self._write_manifest()
+            except BaseException:
+                with self._dirty_lock:
+                    self._dirty |= dirty
+                raise
+
+    def _write_manifest(self):
+        """Записывает манифест и удаляет файлы шардов, которых в нем нет."""
+        files = [os.path.basename(self._shard_path(key)) for key in sorted(self._shard_keys)]
+        manifest = dict(self._layout, version=_MANIFEST_VERSION, files=files)
+        atomic_write(os.path.join(self._directory, SHARD_MANIFEST),
+                     lambda file: json.dump(manifest, file, ensure_ascii=False, indent=2),
+                     self._fsync)
+        self._manifest_stale = False
+        listed = set(files)
+        for name in os.listdir(self._directory):
+            if name.startswith('shard-') and name.endswith('.json') and name not in listed:
+                os.remove(os.path.join(self._directory, name))
 
 
 class TeacherRepYaml(TeacherRepository):
     """Реализация репозитория для YAML формата."""
 
-    def __init__(self, filename: str):
-        """Инициализирует YAML репозиторий."""
+    def __init__(self, filename: str, backups: int = 0, fsync: bool = True,
+                 codec: str = AUTO):
+        """Инициализирует YAML репозиторий (параметры как у TeacherRepJson)."""
         super().__init__()
         self._filename = filename
+        self._backups = backups
+        self._fsync = fsync
+        self._codec = get_codec('yaml', codec)
         self._load_from_file()
 
     def _load_from_file(self):
-        """Загружает данные из YAML файла."""
-        try:
-            with open(self._filename, 'r', encoding='utf-8') as file:
-                data = yaml.safe_load(file)
-                if data is None:
-                    self._teachers = []
-                    return
-
-                self._teachers = []
-                for item in data:
-                    try:
-                        teacher = Teacher(
-                            teacher_id=item['teacher_id'],
-                            last_name=item['last_name'],
-                            first_name=item['first_name'],
-                            patronymic=item.get('patronymic'),
-                            academic_degree=item.get('academic_degree'),
-                            administrative_position=item.get('administrative_position'),
-                            experience_years=item.get('experience_years', 0),
-                            snils=item.get('snils')
-                        )
-                        self._teachers.append(teacher)
-                    except (ValueError, KeyError) as e:
-                        print(f"Ошибка при создании преподавателя: {e}")
-        except FileNotFoundError:
-            self._teachers = []
-        except yaml.YAMLError as e:
-            print(f"Ошибка чтения YAML файла {self._filename}: {e}")
-            self._teachers = []
-
+        """Загружает данные из YAML файла (из резервной копии, если он поврежден)."""
+        # yaml и psycopg2 импортируются при первом использовании своего
+        # хранилища, чтобы не замедлять запуск приложения
+        import yaml
+        data = load_with_recovery(self._filename,
+                                  _read_records(lambda file: self._codec.load(file) or []),
+                                  (yaml.YAMLError, ValueError), self._backups)
+        self._teachers = _collect_teachers(TeacherParser.parse_records(data or []))
+        self._rebuild_index()
+
+    @_locked
     def save_to_file(self):
         """Сохраняет данные в YAML файл."""
-        data = []
-        for teacher in self._teachers:
-            teacher_data = {
-                'teacher_id': teacher.teacher_id,
-                'last_name': teacher.last_name,
-                'first_name': teacher.first_name,
-                'patronymic': teacher.patronymic,
-                'academic_degree': teacher.academic_degree,
-                'administrative_position': teacher.administrative_position,
-                'experience_years': teacher.experience_years,
-                'snils': teacher.snils
-            }
-            data.append(teacher_data)
-
-        with open(self._filename, 'w', encoding='utf-8') as file:
-            yaml.dump(data, file, allow_unicode=True, default_flow_style=False,
-                      indent=2)
+        if self._in_transaction:
+            return
+
+        # Копия списка: сохранение может выполняться в фоновом потоке
+        data = [_teacher_record(teacher) for teacher in list(self._teachers)]
+
+        atomic_write(self._filename, lambda file: self._codec.dump(data, file),
+                     self._fsync, self._backups)
 
 
 class TeacherRepDBAdapter(TeacherRepository):
     """Адаптер для работы с базой данных."""
 
     def __init__(self, host: str, database: str, username: str, password: str,
-                 port: int = 5432):
+                 port: int = 5432, itersize: int = 1000, query_log: QueryLog | None = None):
         """Инициализирует адаптер БД."""
         super().__init__()
-        self._db_repository = TeacherRepDB(host, database, username, password, port)
+        self._db_repository = TeacherRepDB(host, database, username, password, port,
+                                           itersize, query_log)
 
     def get_by_id(self, teacher_id: int) -> Teacher | None:
         """Возвращает преподавателя по ID из БД."""
         return self._db_repository.get_by_id(teacher_id)
 
+    def get_many(self, teacher_ids) -> List[Teacher]:
+        """Возвращает преподавателей по списку ID из БД."""
+        return self._db_repository.get_many(teacher_ids)
+
     def get_by_snils(self, snils: str) -> Teacher | None:
         """Возвращает преподавателя по СНИЛС из БД."""
         return self._db_repository.get_by_snils(snils)
@@ -285,28 +908,82 @@ class TeacherRepDBAdapter(TeacherRepository):
         """Возвращает список преподавателей с пагинацией из БД."""
         return self._db_repository.get_k_n_short_list(k, n)
 
+    def iter_teachers(self) -> Iterator[Teacher]:
+        """Потоково возвращает всех преподавателей из БД."""
+        return self._db_repository.iter_all()
+
+    def iter_sorted(self, key: str = 'teacher_id') -> Iterator[Teacher]:
+        """Потоково возвращает преподавателей из БД, упорядоченных по ключу."""
+        return self._db_repository.iter_all(order_by=key)
+
+    def get_row(self, teacher_id: int, fields=None):
+        """Возвращает строку преподавателя по ID из БД."""
+        return self._db_repository.get_row(teacher_id, fields)
+
+    def iter_rows(self, fields=None) -> Iterator:
+        """Потоково возвращает строки преподавателей из БД."""
+        return self._db_repository.iter_rows(fields)
+
+    def get_rows_page(self, k: int, n: int, fields=None) -> list:
+        """Возвращает страницу строк преподавателей из БД."""
+        return self._db_repository.get_rows_page(k, n, fields)
+
+    def transaction(self):
+        """Объединяет несколько изменений в одну транзакцию БД."""
+        return self._db_repository.transaction()
+
+    def set_change_feed(self, feed: ChangeFeed | None):
+        """Подключает поток событий изменения данных БД."""
+        self._db_repository.set_change_feed(feed)
+
+    @property
+    def generation(self) -> int:
+        """Возвращает поколение данных БД."""
+        return self._db_repository.generation
+
+    @property
+    def last_modified(self) -> float:
+        """Возвращает время последнего изменения данных БД."""
+        return self._db_repository.last_modified
+
+    def version(self) -> tuple[int, float]:
+        """Возвращает поколение и время последнего изменения данных БД одним запросом."""
+        return self._db_repository.version()
+
     def add_teacher(self, teacher_data: dict) -> Teacher:
         """Добавляет нового преподавателя в БД."""
         return self._db_repository.add_teacher(teacher_data)
 
+    def add_teachers(self, teachers: Iterable[Teacher]) -> List[Teacher]:
+        """Добавляет уже проверенных преподавателей в БД, сохраняя их ID."""
+        return self._db_repository.add_teachers(teachers)
+
     def update_teacher(self, teacher_id: int, teacher_data: dict) -> Teacher | None:
         """Обновляет данные преподавателя в БД."""
         return self._db_repository.update_teacher(teacher_id, teacher_data)
 
+    def update_many(self, updates: Iterable[tuple[int, dict]]) -> int:
+        """Обновляет преподавателей по парам (ID, данные) в БД."""
+        return self._db_repository.update_many(updates)
+
     def delete_teacher(self, teacher_id: int) -> bool:
         """Удаляет преподавателя по ID из БД."""
         return self._db_repository.delete_teacher(teacher_id)
 
+    def delete_many(self, teacher_ids) -> int:
+        """Удаляет преподавателей по списку ID из БД."""
+        return self._db_repository.delete_many(teacher_ids)
+
+    def aggregate(self) -> dict:
+        """Возвращает статистику по преподавателям из БД."""
+        return self._db_repository.aggregate()
+
     def get_count(self) -> int:
         """Возвращает количество преподавателей из БД."""
         return self._db_repository.get_count()
 
     def sort_by_field(self, field: str = "last_name") -> List[Teacher]:
         """Сортирует преподавателей по указанному полю из БД."""
-        all_teachers = self._db_repository.get_k_n_short_list(
-            self._db_repository.get_count(), 1
-        )
-
         sort_functions = {
             'teacher_id': lambda t: t.teacher_id,
             'last_name': lambda t: t.last_name,
@@ -318,7 +995,7 @@ class TeacherRepDBAdapter(TeacherRepository):
         if field not in sort_functions:
             raise ValueError(f"Недопустимое поле для сортировки: {field}")
 
-        return sorted(all_teachers, key=sort_functions[field])
+        return sorted(self._db_repository.iter_all(), key=sort_functions[field])
 
 
 class DatabaseConnection:
@@ -342,6 +1019,7 @@ class DatabaseConnection:
 
     def get_connection(self):
         """Возвращает соединение с базой данных."""
+        import psycopg2
         return psycopg2.connect(self._connection_string)
 
 
@@ -349,15 +1027,170 @@ class TeacherRepDB:
     """Реализация репозитория для работы с базой данных."""
 
     def __init__(self, host: str, database: str, username: str, password: str,
-                 port: int = 5432):
-        """Инициализирует репозиторий БД."""
+                 port: int = 5432, itersize: int = 1000, query_log: QueryLog | None = None):
+        """Инициализирует репозиторий БД.
+
+        itersize задает число строк, получаемых за один запрос при
+        потоковом чтении через серверный курсор. С query_log каждый
+        запрос учитывается в статистике и журнале медленных запросов.
+        """
         self._db_connection = DatabaseConnection(host, database, username,
                                                  password, port)
+        self._itersize = itersize
+        self._query_log = query_log
+        # Подготовленные выражения живут в рамках сессии, поэтому
+        # каждый поток держит свое соединение
+        self._local = threading.local()
+        self._cursor_names = count(1)
+        self._change_feed: ChangeFeed | None = None
+        # Версия таблицы в БД и соответствующее ей поколение процесса
+        self._version_lock = threading.Lock()
+        self._db_version = None
+        self._generation = next(_generations)
         self._create_table_if_not_exists()
 
+    def _read_version(self) -> tuple[int, float]:
+        """Возвращает поколение и время последнего изменения таблицы.
+
+        Версию увеличивает триггер на каждую запись в teachers, поэтому
+        учитываются и изменения других процессов и внешних клиентов.
+        Поколение берется из общего счетчика процесса, чтобы не совпадать
+        с поколениями файловых репозиториев.
+        """
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            self._execute_prepared(cursor, 'teachers_version')
+            version, updated_at = cursor.fetchone()
+        with self._version_lock:
+            if version != self._db_version:
+                self._db_version = version
+                self._generation = next(_generations)
+            return self._generation, updated_at
+
+    @property
+    def generation(self) -> int:
+        """Возвращает поколение данных, меняющееся при каждой записи в таблицу."""
+        return self._read_version()[0]
+
+    @property
+    def last_modified(self) -> float:
+        """Возвращает время последней записи в таблицу (Unix time)."""
+        return self._read_version()[1]
+
+    def version(self) -> tuple[int, float]:
+        """Возвращает поколение и время последней записи одним запросом."""
+        return self._read_version()
+
     def _get_connection(self):
-        """Возвращает соединение с БД."""
-        return self._db_connection.get_connection()
+        """Возвращает соединение с БД текущего потока."""
+        conn = getattr(self._local, 'connection', None)
+        if conn is None or conn.closed:
+            conn = self._db_connection.get_connection()
+            DB_CONNECTIONS_OPENED.inc()
+            self._local.connection = conn
+            self._local.prepared = set()
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        """Возвращает соединение, фиксируя транзакцию при выходе из блока.
+
+        Внутри transaction() фиксацией управляет внешний блок.
+        """
+        conn = self._get_connection()
+        if getattr(self._local, 'in_transaction', False):
+            yield conn
+            return
+        self._local.pending_changes = []
+        try:
+            with conn:
+                yield conn
+        except BaseException:
+            DB_TRANSACTIONS.labels('rollback').inc()
+            raise
+        DB_TRANSACTIONS.labels('commit').inc()
+        self._publish_changes()
+
+    @contextmanager
+    def transaction(self):
+        """Выполняет несколько изменений в одной транзакции с одним COMMIT.
+
+        При исключении все изменения блока откатываются.
+        """
+        if getattr(self._local, 'in_transaction', False):
+            yield self
+            return
+
+        conn = self._get_connection()
+        self._local.in_transaction = True
+        self._local.pending_changes = []
+        try:
+            with conn:
+                yield self
+        except BaseException:
+            DB_TRANSACTIONS.labels('rollback').inc()
+            raise
+        finally:
+            self._local.in_transaction = False
+        DB_TRANSACTIONS.labels('commit').inc()
+        self._publish_changes()
+
+    def set_change_feed(self, feed: ChangeFeed | None):
+        """Подключает поток событий изменения данных."""
+        self._change_feed = feed
+
+    def _record_changes(self, kind: str, before_rows, after_rows):
+        """Запоминает изменения до фиксации транзакции."""
+        if self._change_feed is None:
+            return
+        self._local.pending_changes.extend(
+            (kind,
+             self._row_to_teacher(before).snapshot() if before else None,
+             self._row_to_teacher(after).snapshot() if after else None)
+            for before, after in zip(before_rows, after_rows)
+        )
+
+    def _publish_changes(self):
+        """Публикует изменения зафиксированной транзакции."""
+        changes, self._local.pending_changes = self._local.pending_changes, []
+        if self._change_feed is not None:
+            self._change_feed.publish(changes)
+
+    @property
+    def query_log(self) -> QueryLog | None:
+        """Возвращает журнал запросов (None — запросы не учитываются)."""
+        return self._query_log
+
+    def _cursor(self, conn, name: str | None = None):
+        """Создает курсор, учитывающий запросы в журнале, если он задан."""
+        cursor = conn.cursor(name=name) if name else conn.cursor()
+        if self._query_log is None:
+            return cursor
+        return InstrumentedCursor(cursor, self._query_log)
+
+    def _execute_prepared(self, cursor, name: str, params: tuple = ()):
+        """Выполняет подготовленное выражение, подготавливая его при первом вызове."""
+        prepared = self._local.prepared
+        if name not in prepared:
+            cursor.execute(f"PREPARE {name} AS {_PREPARED_STATEMENTS[name]}")
+            prepared.add(name)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+        else:
+            cursor.execute(f"EXECUTE {name}")
+
+    @property
+    def itersize(self) -> int:
+        """Возвращает размер пакета для серверного курсора."""
+        return self._itersize
+
+    @itersize.setter
+    def itersize(self, value: int):
+        """Устанавливает размер пакета для серверного курсора."""
+        if not isinstance(value, int) or value <= 0:
+            raise ValueError("itersize must be a positive integer")
+        self._itersize = value
 
     def _create_table_if_not_exists(self):
         """Создает таблицу, если она не существует."""
@@ -373,213 +1206,398 @@ class TeacherRepDB:
             snils VARCHAR(11) UNIQUE
         )
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        # Версия данных для кэша страниц и ETag: увеличивается триггером на
+        # уровне выражения при любой записи, кем бы она ни выполнялась
+        create_version_sql = """
+        CREATE TABLE IF NOT EXISTS teachers_version (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            version BIGINT NOT NULL DEFAULT 0,
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        INSERT INTO teachers_version (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
+        CREATE OR REPLACE FUNCTION teachers_bump_version() RETURNS trigger AS $$
+        BEGIN
+            UPDATE teachers_version SET version = version + 1, updated_at = clock_timestamp();
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql;
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'teachers_version_bump') THEN
+                CREATE TRIGGER teachers_version_bump
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON teachers
+                FOR EACH STATEMENT EXECUTE FUNCTION teachers_bump_version();
+            END IF;
+        END
+        $$;
+        """
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
             cursor.execute(create_table_sql)
-            conn.commit()
+            cursor.execute(create_version_sql)
+
+    @staticmethod
+    def _row_to_teacher(row) -> Teacher:
+        """Создает преподавателя из строки результата запроса."""
+        return Teacher(
+            teacher_id=row[0],
+            last_name=row[1],
+            first_name=row[2],
+            patronymic=row[3],
+            academic_degree=row[4],
+            administrative_position=row[5],
+            experience_years=row[6],
+            snils=row[7]
+        )
+
+    @staticmethod
+    def _row_to_snapshot(row) -> TeacherSnapshot:
+        """Создает снимок из строки результата запроса.
+
+        Данные в таблице проверены при записи, поэтому объект Teacher
+        с повторной проверкой полей не создается.
+        """
+        return TeacherSnapshot(*row[:7], Snils(row[7]))
+
+    @staticmethod
+    def _validate_teacher_data(teacher_data: dict, with_snils: bool = True) -> tuple:
+        """Проверяет данные преподавателя без обращения к БД.
+
+        Возвращает значения полей в порядке столбцов таблицы (без teacher_id).
+        """
+        values = (
+            Teacher.validate_name(teacher_data['last_name'], "Last name"),
+            Teacher.validate_name(teacher_data['first_name'], "First name"),
+            Teacher.validate_name(teacher_data.get('patronymic'), "patronymic", True),
+            Teacher.validate_optional_string(teacher_data.get('academic_degree'), "academic_degree"),
+            Teacher.validate_optional_string(teacher_data.get('administrative_position'),
+                                             "administrative_position"),
+            Teacher.validate_experience_years(teacher_data.get('experience_years', 0))
+        )
+        if with_snils:
+            values += (Teacher.validate_snils(teacher_data.get('snils')),)
+        return values
 
     def get_by_id(self, teacher_id: int) -> Teacher | None:
         """Возвращает преподавателя по ID из БД."""
-        sql = """SELECT teacher_id, last_name, first_name, patronymic, academic_degree,
-        administrative_position, experience_years,
-        snils FROM teachers WHERE teacher_id = %s"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (teacher_id,))
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            self._execute_prepared(cursor, 'teacher_by_id', (teacher_id,))
             row = cursor.fetchone()
             if row:
-                return Teacher(
-                    teacher_id=row[0],
-                    last_name=row[1],
-                    first_name=row[2],
-                    patronymic=row[3],
-                    academic_degree=row[4],
-                    administrative_position=row[5],
-                    experience_years=row[6],
-                    snils=row[7]
-                )
+                return self._row_to_teacher(row)
         return None
 
+    def get_many(self, teacher_ids) -> List[Teacher]:
+        """Возвращает преподавателей по списку ID одним запросом.
+
+        Порядок результата совпадает с порядком переданных ID.
+        """
+        teacher_ids = list(teacher_ids)
+        if not teacher_ids:
+            return []
+        sql = f"SELECT {_TEACHER_COLUMNS} FROM teachers WHERE teacher_id = ANY(%s)"
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(sql, (teacher_ids,))
+            by_id = {row[0]: row for row in cursor.fetchall()}
+        return [self._row_to_teacher(by_id[teacher_id]) for teacher_id in teacher_ids
+                if teacher_id in by_id]
+
     def get_by_snils(self, snils: str) -> Teacher | None:
         """Возвращает преподавателя по СНИЛС из БД."""
-        sql = """SELECT teacher_id, last_name, first_name, patronymic, academic_degree,
-        administrative_position, experience_years, snils FROM teachers WHERE snils = %s"""
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (snils,))
+        key = Snils.try_parse(snils)
+        if key is None:
+            return None
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            self._execute_prepared(cursor, 'teacher_by_snils', (key.digits,))
             row = cursor.fetchone()
             if row:
-                return Teacher(
-                    teacher_id=row[0],
-                    last_name=row[1],
-                    first_name=row[2],
-                    patronymic=row[3],
-                    academic_degree=row[4],
-                    administrative_position=row[5],
-                    experience_years=row[6],
-                    snils=row[7]
-                )
+                return self._row_to_teacher(row)
         return None
 
     def get_k_n_short_list(self, k: int, n: int) -> List[Teacher]:
         """Возвращает список преподавателей с пагинацией из БД."""
-        sql = """
-        SELECT teacher_id, last_name, first_name, patronymic, academic_degree,
-        administrative_position, experience_years, snils
-        FROM teachers
-        ORDER BY teacher_id
-        LIMIT %s OFFSET %s
-        """
         offset = (n - 1) * k
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (k, offset))
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            self._execute_prepared(cursor, 'teachers_page', (k, offset))
             rows = cursor.fetchall()
-            result = []
-            for row in rows:
-                teacher = Teacher(
-                    teacher_id=row[0],
-                    last_name=row[1],
-                    first_name=row[2],
-                    patronymic=row[3],
-                    academic_degree=row[4],
-                    administrative_position=row[5],
-                    experience_years=row[6],
-                    snils=row[7]
-                )
-                result.append(teacher)
+            result = [self._row_to_teacher(row) for row in rows]
             if len(result) == 0:
                 raise IndexError("start index out of range")
             return result
 
+    def _scan(self, itersize: int | None, order_by: str,
+              columns: str = _TEACHER_COLUMNS) -> Iterator[tuple]:
+        """Потоково возвращает строки таблицы через серверный курсор."""
+        if order_by not in _ORDER_BY:
+            raise ValueError(f"Недопустимый ключ упорядочивания: {order_by}")
+        sql = f"SELECT {columns} FROM teachers ORDER BY {_ORDER_BY[order_by]}"
+        with self._connection() as conn:
+            with self._cursor(conn, f"teachers_scan_{next(self._cursor_names)}") as cursor:
+                cursor.itersize = itersize or self._itersize
+                cursor.execute(sql)
+                yield from cursor
+
+    def iter_all(self, itersize: int | None = None,
+                 order_by: str = 'teacher_id') -> Iterator[Teacher]:
+        """Потоково возвращает всех преподавателей через серверный курсор.
+
+        В памяти клиента одновременно находится не более itersize строк.
+        """
+        for row in self._scan(itersize, order_by):
+            yield self._row_to_teacher(row)
+
+    def _projection(self, fields) -> tuple[str, Callable]:
+        """Возвращает список столбцов SELECT и функцию построения строки.
+
+        Имена полей проверяются по TEACHER_FIELDS, поэтому их можно
+        подставлять в текст запроса.
+        """
+        if fields is None:
+            return _TEACHER_COLUMNS, self._row_to_snapshot
+        row_class = row_type(tuple(fields))
+        return ", ".join(row_class._fields), row_class._make
+
+    def get_row(self, teacher_id: int, fields=None):
+        """Возвращает строку преподавателя по ID без создания Teacher.
+
+        С fields из БД читаются только перечисленные столбцы.
+        """
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            if fields is None:
+                self._execute_prepared(cursor, 'teacher_by_id', (teacher_id,))
+                to_row = self._row_to_snapshot
+            else:
+                columns, to_row = self._projection(fields)
+                cursor.execute(f"SELECT {columns} FROM teachers WHERE teacher_id = %s",
+                               (teacher_id,))
+            row = cursor.fetchone()
+            return to_row(row) if row else None
+
+    def iter_rows(self, fields=None, itersize: int | None = None) -> Iterator:
+        """Потоково возвращает строки преподавателей без создания Teacher."""
+        columns, to_row = self._projection(fields)
+        for row in self._scan(itersize, 'teacher_id', columns):
+            yield to_row(row)
+
+    def get_rows_page(self, k: int, n: int, fields=None) -> list:
+        """Возвращает страницу строк преподавателей без создания Teacher."""
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            if fields is None:
+                self._execute_prepared(cursor, 'teachers_page', (k, (n - 1) * k))
+                to_row = self._row_to_snapshot
+            else:
+                columns, to_row = self._projection(fields)
+                cursor.execute(f"SELECT {columns} FROM teachers ORDER BY teacher_id "
+                               f"LIMIT %s OFFSET %s", (k, (n - 1) * k))
+            return [to_row(row) for row in cursor.fetchall()]
+
     def add_teacher(self, teacher_data: dict) -> Teacher:
-        """Добавляет нового преподавателя в БД."""
-        sql = """
+        """Добавляет нового преподавателя в БД.
+
+        Уникальность СНИЛС проверяется ограничением UNIQUE в самом INSERT,
+        поэтому запись выполняется за один запрос.
+        """
+        sql = f"""
         INSERT INTO teachers (last_name, first_name, patronymic,
         academic_degree, administrative_position, experience_years, snils)
         VALUES (%s, %s, %s, %s, %s, %s, %s)
-        RETURNING teacher_id
+        ON CONFLICT (snils) DO NOTHING
+        RETURNING {_TEACHER_COLUMNS}
         """
-        snils = teacher_data.get('snils')
-
-        # Создаем временный объект для проверки уникальности
-        temp_teacher = Teacher(
-            teacher_id=0,  # Временный ID
-            last_name=teacher_data['last_name'],
-            first_name=teacher_data['first_name'],
-            patronymic=teacher_data.get('patronymic'),
-            academic_degree=teacher_data.get('academic_degree'),
-            administrative_position=teacher_data.get('administrative_position'),
-            experience_years=teacher_data.get('experience_years', 0),
-            snils=snils
-        )
+        values = self._validate_teacher_data(teacher_data)
 
-        # Проверка на уникальность СНИЛС используя __eq__
-        if snils:
-            existing_teacher = self.get_by_snils(snils)
-            if existing_teacher and existing_teacher == temp_teacher:
-                msg = f"Преподаватель с СНИЛС {snils} уже существует"
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(sql, values)
+            row = cursor.fetchone()
+            if row is None:
+                msg = f"Преподаватель с СНИЛС {teacher_data.get('snils')} уже существует"
                 raise ValueError(msg)
+            self._record_changes(ADDED, [None], [row])
+            return self._row_to_teacher(row)
 
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (
-                teacher_data['last_name'],
-                teacher_data['first_name'],
-                teacher_data.get('patronymic'),
-                teacher_data.get('academic_degree'),
-                teacher_data.get('administrative_position'),
-                teacher_data.get('experience_years', 0),
-                snils
-            ))
-            new_id = cursor.fetchone()[0]
-            conn.commit()
-
-            return Teacher(
-                teacher_id=new_id,
-                last_name=teacher_data['last_name'],
-                first_name=teacher_data['first_name'],
-                patronymic=teacher_data.get('patronymic'),
-                academic_degree=teacher_data.get('academic_degree'),
-                administrative_position=teacher_data.get('administrative_position'),
-                experience_years=teacher_data.get('experience_years', 0),
-                snils=snils
-            )
+    def add_teachers(self, teachers: Iterable[Teacher], page_size: int = 1000) -> List[Teacher]:
+        """Добавляет уже проверенных преподавателей пакетами, сохраняя их ID.
 
-    def update_teacher(self, teacher_id: int, teacher_data: dict) -> Teacher | None:
-        """Обновляет данные преподавателя в БД."""
-        # Получаем текущего преподавателя для сохранения СНИЛС
-        current_teacher = self.get_by_id(teacher_id)
-        if not current_teacher:
-            return None
-
-        # Создаем временный объект для проверки уникальности
-        temp_teacher = Teacher(
-            teacher_id=teacher_id,
-            last_name=teacher_data['last_name'],
-            first_name=teacher_data['first_name'],
-            patronymic=teacher_data.get('patronymic'),
-            academic_degree=teacher_data.get('academic_degree'),
-            administrative_position=teacher_data.get('administrative_position'),
-            experience_years=teacher_data.get('experience_years', 0),
-            snils=current_teacher.snils  # Используем текущий СНИЛС
-        )
+        Строки с занятым ID или СНИЛС пропускаются через ON CONFLICT и
+        возвращаются списком отклоненных.
+        """
+        sql = f"""
+        INSERT INTO teachers ({_TEACHER_COLUMNS}) VALUES %s
+        ON CONFLICT DO NOTHING
+        RETURNING {_TEACHER_COLUMNS}
+        """
+        import psycopg2.extras
+        rejected = []
+        batch = []
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+
+            def flush():
+                rows = [(t.teacher_id, t.last_name, t.first_name, t.patronymic,
+                         t.academic_degree, t.administrative_position,
+                         t.experience_years, t.snils) for t in batch]
+                inserted = psycopg2.extras.execute_values(cursor, sql, rows,
+                                                          page_size=page_size, fetch=True)
+                self._record_changes(ADDED, [None] * len(inserted), inserted)
+                inserted_ids = {row[0] for row in inserted}
+                for t in batch:
+                    # Повтор ID внутри пакета: вставлена только первая строка
+                    if t.teacher_id in inserted_ids:
+                        inserted_ids.discard(t.teacher_id)
+                    else:
+                        rejected.append(t)
+                batch.clear()
+
+            for teacher in teachers:
+                batch.append(teacher)
+                if len(batch) >= page_size:
+                    flush()
+            if batch:
+                flush()
+
+            # ID заданы явно, поэтому последовательность нужно сдвинуть вручную
+            cursor.execute("""
+            SELECT setval(pg_get_serial_sequence('teachers', 'teacher_id'),
+            COALESCE(MAX(teacher_id), 1)) FROM teachers
+            """)
+        return rejected
 
-        # Проверка уникальности СНИЛС (кроме текущего преподавателя)
-        if current_teacher.snils:
-            existing_teacher = self.get_by_snils(current_teacher.snils)
-            if (existing_teacher and existing_teacher.teacher_id != teacher_id and
-                    existing_teacher == temp_teacher):
-                msg = f"Преподаватель с СНИЛС {current_teacher.snils} уже существует"
-                raise ValueError(msg)
+    def update_teacher(self, teacher_id: int, teacher_data: dict) -> Teacher | None:
+        """Обновляет данные преподавателя в БД.
 
-        sql = """
-        UPDATE teachers
+        СНИЛС не изменяется, поэтому проверка уникальности не нужна.
+        Прежняя и сохраненная строки возвращаются тем же запросом через
+        RETURNING.
+        """
+        sql = f"""
+        UPDATE teachers AS t
         SET last_name = %s, first_name = %s, patronymic = %s,
         academic_degree = %s, administrative_position = %s, experience_years = %s
-        WHERE teacher_id = %s
-        """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql, (
-                teacher_data['last_name'],
-                teacher_data['first_name'],
-                teacher_data.get('patronymic'),
-                teacher_data.get('academic_degree'),
-                teacher_data.get('administrative_position'),
-                teacher_data.get('experience_years', 0),
-                teacher_id
-            ))
-            if cursor.rowcount > 0:
-                conn.commit()
-                return Teacher(
-                    teacher_id=teacher_id,
-                    last_name=teacher_data['last_name'],
-                    first_name=teacher_data['first_name'],
-                    patronymic=teacher_data.get('patronymic'),
-                    academic_degree=teacher_data.get('academic_degree'),
-                    administrative_position=teacher_data.get('administrative_position'),
-                    experience_years=teacher_data.get('experience_years', 0),
-                    snils=current_teacher.snils  # Сохраняем оригинальный СНИЛС
-                )
-        return None
+        FROM (SELECT {_TEACHER_COLUMNS} FROM teachers WHERE teacher_id = %s FOR UPDATE) AS old
+        WHERE t.teacher_id = old.teacher_id
+        RETURNING {_columns('old')}, {_columns('t')}
+        """
+        values = self._validate_teacher_data(teacher_data, with_snils=False)
+
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(sql, values + (teacher_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            before, after = row[:len(_TEACHER_COLUMN_NAMES)], row[len(_TEACHER_COLUMN_NAMES):]
+            self._record_changes(UPDATED, [before], [after])
+            return self._row_to_teacher(after)
+
+    def update_many(self, updates: Iterable[tuple[int, dict]], page_size: int = 1000) -> int:
+        """Обновляет преподавателей пакетами: один UPDATE ... FROM (VALUES ...) на пакет.
+
+        Строки пакета сначала блокируются, поэтому прежние значения,
+        прочитанные соединением с таблицей, не устаревают до обновления.
+        """
+        names = ('teacher_id',) + _TEACHER_COLUMN_NAMES[1:-1]
+        sql = f"""
+        UPDATE teachers AS t
+        SET {", ".join(f"{name} = v.{name}" for name in names[1:])}
+        FROM (VALUES %s) AS v({", ".join(names)}), teachers AS old
+        WHERE t.teacher_id = v.teacher_id AND old.teacher_id = v.teacher_id
+        RETURNING {_columns('old')}, {_columns('t')}
+        """
+        import psycopg2.extras
+        count = 0
+        batch = []
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+
+            def flush():
+                nonlocal count
+                cursor.execute("SELECT 1 FROM teachers WHERE teacher_id = ANY(%s) FOR UPDATE",
+                               ([row[0] for row in batch],))
+                rows = psycopg2.extras.execute_values(cursor, sql, batch,
+                                                      page_size=page_size, fetch=True)
+                width = len(_TEACHER_COLUMN_NAMES)
+                self._record_changes(UPDATED, [row[:width] for row in rows],
+                                     [row[width:] for row in rows])
+                count += len(rows)
+                batch.clear()
+
+            for teacher_id, teacher_data in updates:
+                batch.append((teacher_id,) + self._validate_teacher_data(teacher_data, with_snils=False))
+                if len(batch) >= page_size:
+                    flush()
+            if batch:
+                flush()
+        return count
 
     def delete_teacher(self, teacher_id: int) -> bool:
         """Удаляет преподавателя по ID из БД."""
-        sql = "DELETE FROM teachers WHERE teacher_id = %s"
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
+        sql = f"DELETE FROM teachers WHERE teacher_id = %s RETURNING {_TEACHER_COLUMNS}"
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
             cursor.execute(sql, (teacher_id,))
-            deleted = cursor.rowcount > 0
-            conn.commit()
-            return deleted
+            rows = cursor.fetchall()
+            self._record_changes(DELETED, rows, [None] * len(rows))
+            return len(rows) > 0
+
+    def delete_many(self, teacher_ids) -> int:
+        """Удаляет преподавателей по списку ID одним запросом."""
+        teacher_ids = list(teacher_ids)
+        if not teacher_ids:
+            return 0
+        sql = f"DELETE FROM teachers WHERE teacher_id = ANY(%s) RETURNING {_TEACHER_COLUMNS}"
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(sql, (teacher_ids,))
+            rows = cursor.fetchall()
+            self._record_changes(DELETED, rows, [None] * len(rows))
+            return len(rows)
+
+    def aggregate(self) -> dict:
+        """Возвращает статистику по преподавателям одним запросом GROUP BY."""
+        cases = " ".join(
+            f"WHEN experience_years < {EXPERIENCE_BUCKETS[i + 1]} THEN '{_bucket_label(i)}'"
+            for i in range(len(EXPERIENCE_BUCKETS) - 1)
+        )
+        sql = f"""
+        SELECT GROUPING(academic_degree), GROUPING(administrative_position),
+        academic_degree, administrative_position, experience_bucket, COUNT(*)
+        FROM (
+            SELECT academic_degree, administrative_position,
+            CASE {cases} ELSE '{_bucket_label(len(EXPERIENCE_BUCKETS) - 1)}' END
+            AS experience_bucket
+            FROM teachers
+        ) AS t
+        GROUP BY GROUPING SETS ((academic_degree), (administrative_position),
+        (experience_bucket), ())
+        """
+        total = 0
+        degrees, positions, experience = {}, {}, {}
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            cursor.execute(sql)
+            for degree_grouped, position_grouped, degree, position, bucket, n in cursor:
+                if not degree_grouped:
+                    degrees[degree or NOT_SPECIFIED] = n
+                elif not position_grouped:
+                    positions[position or NOT_SPECIFIED] = n
+                elif bucket is not None:
+                    experience[bucket] = n
+                else:
+                    total = n
+        return _stats_dict(total, degrees, positions, experience)
 
     def get_count(self) -> int:
         """Возвращает количество преподавателей в БД."""
-        sql = "SELECT COUNT(*) as count FROM teachers"
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(sql)
+        with self._connection() as conn:
+            cursor = self._cursor(conn)
+            self._execute_prepared(cursor, 'teachers_count')
             return cursor.fetchone()[0]
 
 
@@ -591,33 +1609,37 @@ class FilterDecorator:
         self._repository = repository
         self._filter_func: Callable = filter_func
 
+    def iter_teachers(self) -> Iterator[Teacher]:
+        """Потоково возвращает отфильтрованных преподавателей."""
+        teachers = self._repository.iter_teachers()
+        if self._filter_func:
+            return filter(self._filter_func, teachers)
+        return teachers
+
     def get_k_n_short_list(self, k: int, n: int) -> List[Teacher]:
         """Возвращает отфильтрованный список с пагинацией."""
-        teachers = self._repository.get_k_n_short_list(
-            self._repository.get_count(), 1
-        )
-
-        if self._filter_func:
-            teachers = [t for t in teachers if self._filter_func(t)]
+        return _paginate(self.iter_teachers(), k, n)
 
-        start_index = (n - 1) * k
-        end_index = start_index + k
+    def iter_rows(self, fields=None) -> Iterator:
+        """Потоково возвращает отфильтрованные строки преподавателей.
 
-        if start_index >= len(teachers):
-            raise IndexError("start index out of range")
+        Проекция fields должна включать поля, используемые фильтром.
+        """
+        rows = self._repository.iter_rows(fields)
+        if self._filter_func:
+            return filter(self._filter_func, rows)
+        return rows
 
-        return list(teachers[start_index:end_index])
+    def get_rows_page(self, k: int, n: int, fields=None) -> list:
+        """Возвращает страницу отфильтрованных строк."""
+        return _page(self.iter_rows(fields), k, n)
 
     def get_count(self) -> int:
-        """Возвращает количество отфильтрованных преподавателей."""
-        teachers = self._repository.get_k_n_short_list(
-            self._repository.get_count(), 1
-        )
-
-        if self._filter_func:
-            teachers = [t for t in teachers if self._filter_func(t)]
+        """Возвращает количество отфильтрованных преподавателей.
 
-        return len(teachers)
+        Для подсчета достаточно снимков, полные объекты не создаются.
+        """
+        return sum(1 for _ in self.iter_rows())
 
     @property
     def filter_func(self) -> Callable:
@@ -642,24 +1664,46 @@ class SortDecorator:
         self._sort_func: Callable = sort_func
         self._reverse: bool = reverse
 
+    def iter_teachers(self) -> Iterator[Teacher]:
+        """Возвращает отсортированных преподавателей."""
+        teachers = self._repository.iter_teachers()
+
+        if self._sort_func:
+            return iter(sorted(teachers, key=self._sort_func, reverse=self._reverse))
+        if self._reverse:
+            return reversed(list(teachers))
+        return teachers
+
     def get_k_n_short_list(self, k: int, n: int) -> List[Teacher]:
-        """Возвращает отсортированный список с пагинацией."""
-        teachers = self._repository.get_k_n_short_list(
-            self._repository.get_count(), 1
-        )
+        """Возвращает отсортированный список с пагинацией.
 
+        Для страницы достаточно держать в памяти первые n * k элементов.
+        """
         if self._sort_func:
-            teachers = sorted(teachers, key=self._sort_func, reverse=self._reverse)
-        elif self._reverse:
-            teachers.reverse()
+            select = heapq.nlargest if self._reverse else heapq.nsmallest
+            teachers = select(n * k, self._repository.iter_teachers(), key=self._sort_func)
+            return _paginate(iter(teachers), k, n)
+        return _paginate(self.iter_teachers(), k, n)
 
-        start_index = (n - 1) * k
-        end_index = start_index + k
+    def iter_rows(self, fields=None) -> Iterator:
+        """Возвращает отсортированные строки преподавателей.
 
-        if start_index >= len(teachers):
-            raise IndexError("start index out of range")
+        Проекция fields должна включать поле сортировки.
+        """
+        rows = self._repository.iter_rows(fields)
+        if self._sort_func:
+            return iter(sorted(rows, key=self._sort_func, reverse=self._reverse))
+        if self._reverse:
+            return reversed(list(rows))
+        return rows
 
-        return list(teachers[start_index:end_index])
+    def get_rows_page(self, k: int, n: int, fields=None) -> list:
+        """Возвращает страницу отсортированных строк, храня в памяти n * k элементов."""
+        if self._sort_func:
+            select = heapq.nlargest if self._reverse else heapq.nsmallest
+            rows = select(n * k, self._repository.iter_rows(fields), key=self._sort_func)
+            return _page(rows, k, n)
+        return _page(self.iter_rows(fields), k, n)
 
     def get_count(self):
         """Возвращает количество преподавателей."""
@@ -674,3 +1718,56 @@ class SortDecorator:
     def sort_func(self, func):
         """Устанавливает функцию сортировки."""
         self._sort_func = func
+
+
+class LazyRepository:
+    """Репозиторий, создаваемый при первом обращении.
+
+    Чтение файла или подключение к БД выполняется не при запуске
+    приложения, а при первом вызове метода (или явном load()).
+    Остальные обращения передаются созданному репозиторию.
+    """
+
+    def __init__(self, factory: Callable[[], TeacherRepository]):
+        self._factory = factory
+        self._repository = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """Проверяет, создан ли репозиторий."""
+        return self._repository is not None
+
+    def load(self) -> TeacherRepository:
+        """Создает репозиторий, если он еще не создан, и возвращает его."""
+        repository = self._repository
+        if repository is None:
+            with self._lock:
+                if self._repository is None:
+                    self._repository = self._factory()
+                repository = self._repository
+        return repository
+
+    def close(self):
+        """Закрывает репозиторий, если он был создан."""
+        with self._lock:
+            repository = self._repository
+        if repository is not None:
+            repository.close()
+
+    def __getattr__(self, name):
+        return getattr(self.load(), name)
+
+
+# Замер времени крупных операций: работы с файлами, запросов к БД и выборок
+# через декораторы. Быстрые операции со словарями в памяти не оборачиваются
+instrument(TeacherRepJson, 'repository.json', ('_load_from_file', 'save_to_file'))
+instrument(TeacherRepYaml, 'repository.yaml', ('_load_from_file', 'save_to_file'))
+instrument(TeacherRepJsonSharded, 'repository.json_sharded', ('_load_from_file', 'save_to_file'))
+instrument(TeacherRepDB, 'repository.db', (
+    'get_by_id', 'get_many', 'get_by_snils', 'get_k_n_short_list', 'get_row',
+    'get_rows_page', 'add_teacher', 'add_teachers', 'update_teacher', 'update_many',
+    'delete_teacher', 'delete_many', 'aggregate', 'get_count'
+))
+instrument(FilterDecorator, 'decorator.filter', ('get_k_n_short_list', 'get_rows_page', 'get_count'))
+instrument(SortDecorator, 'decorator.sort', ('get_k_n_short_list', 'get_rows_page'))
@@ -0,0 +1,121 @@
+"""Значение СНИЛС с однократной нормализацией и проверкой контрольной суммы."""
+from functools import lru_cache
+import re
+
+# Размер кэша результатов проверки недавно встречавшихся строк
+SNILS_CACHE_SIZE = 4096
+
+_FORMAT_RE = re.compile(r'^(?:\d{11}|\d{3}-\d{3}-\d{3} \d{2})$')
+_NON_DIGIT_RE = re.compile(r'\D')
+
+
+class Snils:
+    """Проверенный СНИЛС.
+
+    Хранит каноническую форму из 11 цифр и ее хэш. Равен другому Snils или
+    строке с той же канонической формой и имеет тот же хэш, поэтому
+    словари, индексированные Snils, можно опрашивать обычной строкой цифр.
+    """
+
+    __slots__ = ('_digits', '_hash')
+
+    def __init__(self, digits: str):
+        """Создает значение из уже проверенной канонической формы."""
+        self._digits = digits
+        self._hash = hash(digits)
+
+    @classmethod
+    def parse(cls, value) -> 'Snils':
+        """Проверяет и нормализует СНИЛС, используя кэш недавних результатов."""
+        if isinstance(value, Snils):
+            return value
+        if value is None:
+            raise ValueError("SNILS cannot be None")
+        if not isinstance(value, str):
+            raise ValueError("SNILS must be a string")
+
+        result = _parse_cached(value)
+        if isinstance(result, str):
+            raise ValueError(result)
+        return result
+
+    @classmethod
+    def try_parse(cls, value) -> 'Snils | None':
+        """Возвращает Snils или None, если значение не является корректным СНИЛС."""
+        try:
+            return cls.parse(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def cache_info():
+        """Возвращает статистику кэша разбора (hits, misses, maxsize, currsize)."""
+        return _parse_cached.cache_info()
+
+    @staticmethod
+    def validate_checksum(snils_digits: str) -> None:
+        """Проверка контрольной суммы СНИЛС"""
+        base_number = snils_digits[:9]
+        check_number = int(snils_digits[9:])
+
+        # Номера до 001-001-998 контрольной суммой не проверяются
+        if int(base_number) < 1001998:
+            return
+
+        total = 0
+        for i, digit in enumerate(base_number):
+            total += int(digit) * (9 - i)
+
+        control_sum = total % 101
+        if control_sum == 100:
+            control_sum = 0
+
+        if control_sum != check_number:
+            raise ValueError("Invalid SNILS checksum")
+
+    @property
+    def digits(self) -> str:
+        """Возвращает каноническую форму из 11 цифр."""
+        return self._digits
+
+    @property
+    def formatted(self) -> str:
+        """Возвращает СНИЛС в формате '123-456-789 64'."""
+        d = self._digits
+        return f"{d[:3]}-{d[3:6]}-{d[6:9]} {d[9:]}"
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Snils):
+            return self._digits == other._digits
+        if isinstance(other, str):
+            return self._digits == other
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __reduce__(self):
+        # Хэш строк зависит от процесса, поэтому пересчитывается при распаковке
+        return Snils, (self._digits,)
+
+    def __str__(self) -> str:
+        return self._digits
+
+    def __repr__(self) -> str:
+        return f"Snils('{self._digits}')"
+
+
+@lru_cache(maxsize=SNILS_CACHE_SIZE)
+def _parse_cached(value: str) -> Snils | str:
+    """Проверяет строку СНИЛС; ошибки возвращаются текстом, чтобы тоже кэшироваться."""
+    snils_clean = value.strip()
+
+    if not _FORMAT_RE.match(snils_clean):
+        return "SNILS must be in format '12345678964' or '123-456-789 64'"
+
+    digits_only = _NON_DIGIT_RE.sub('', snils_clean)
+    try:
+        Snils.validate_checksum(digits_only)
+    except ValueError as e:
+        return str(e)
+    return Snils(digits_only)
@@ -0,0 +1,160 @@
+"""Атомарная запись файлов данных с резервными копиями и восстановлением."""
+from typing import Callable, TextIO
+import filecmp
+import glob
+import os
+import shutil
+import tempfile
+import time
+
+# Временные файлы старше этого возраста (в секундах) считаются оставшимися
+# после сбоя; более новые может еще записывать другой процесс
+STALE_TEMP_SEC = 60
+
+# Файлы не больше этого размера (в байтах) проверяются на пустоту перед разбором
+_EMPTY_CHECK_SIZE = 4096
+
+
+def _backup_name(filename: str, number: int) -> str:
+    return f"{filename}.{number}"
+
+
+def _fsync_directory(directory: str):
+    """Сохраняет на диск запись каталога, чтобы переименование пережило сбой."""
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _rotate_backups(filename: str, backups: int):
+    """Сдвигает резервные копии (.1 -> .2 ...) и делает текущий файл копией .1."""
+    if not os.path.exists(filename):
+        return
+    for number in range(backups - 1, 0, -1):
+        older = _backup_name(filename, number)
+        if os.path.exists(older):
+            os.replace(older, _backup_name(filename, number + 1))
+    first = _backup_name(filename, 1)
+    try:
+        os.remove(first)
+    except FileNotFoundError:
+        pass
+    try:
+        # Жесткая ссылка не копирует данные: новый файл заменит имя, а не содержимое
+        os.link(filename, first)
+    except OSError:
+        shutil.copy2(filename, first)
+
+
+def atomic_write(filename: str, write: Callable[[TextIO], None],
+                 fsync: bool = True, backups: int = 0):
+    """Записывает файл так, что читатели видят либо старую, либо новую версию.
+
+    Данные пишутся во временный файл в том же каталоге, сбрасываются на
+    диск (при fsync=True) и заменяют исходный файл через os.replace. При
+    backups > 0 предыдущие версии сохраняются как filename.1 ... filename.N.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, temp_name = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(filename)}.",
+                                     suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as file:
+            write(file)
+            file.flush()
+            if fsync:
+                os.fsync(file.fileno())
+        try:
+            # mkstemp создает файл с правами 0600; сохраняем права исходного
+            shutil.copymode(filename, temp_name)
+        except FileNotFoundError:
+            os.chmod(temp_name, 0o644)
+        if backups > 0:
+            _rotate_backups(filename, backups)
+        os.replace(temp_name, filename)
+    except BaseException:
+        try:
+            os.remove(temp_name)
+        except FileNotFoundError:
+            pass
+        raise
+    if fsync:
+        _fsync_directory(directory)
+
+
+def remove_stale_temp_files(filename: str):
+    """Удаляет временные файлы, оставшиеся после прерванной записи."""
+    directory = os.path.dirname(os.path.abspath(filename))
+    pattern = os.path.join(glob.escape(directory), f".{glob.escape(os.path.basename(filename))}.*.tmp")
+    for name in glob.glob(pattern):
+        try:
+            if time.time() - os.path.getmtime(name) > STALE_TEMP_SEC:
+                os.remove(name)
+        except OSError:
+            pass
+
+
+def _is_blank(filename: str) -> bool:
+    """Проверяет, что файл пуст или содержит только пробельные символы."""
+    if os.path.getsize(filename) > _EMPTY_CHECK_SIZE:
+        return False
+    with open(filename, 'rb') as file:
+        return not file.read().strip()
+
+
+def _keep_corrupt_copy(filename: str, keep: int):
+    """Сохраняет копию поврежденного файла, храня не больше keep последних копий.
+
+    Копия не создается, если такая же уже есть: иначе каждый запуск с
+    одним и тем же поврежденным файлом добавлял бы новую.
+    """
+    copies = sorted(glob.glob(f"{glob.escape(filename)}.corrupt-*"))
+    if any(filecmp.cmp(filename, copy, shallow=False) for copy in copies):
+        return
+    corrupt = f"{filename}.corrupt-{time.strftime('%Y%m%d%H%M%S')}"
+    shutil.copy2(filename, corrupt)
+    if corrupt not in copies:
+        copies.append(corrupt)
+    for old in copies[:-keep]:
+        try:
+            os.remove(old)
+        except OSError:
+            pass
+
+
+def load_with_recovery(filename: str, load: Callable[[TextIO], object],
+                       errors: tuple, backups: int = 0):
+    """Читает файл, а если он поврежден — последнюю читаемую резервную копию.
+
+    load разбирает открытый файл и выбрасывает одно из errors, если данные
+    повреждены. Поврежденный файл сохраняется как filename.corrupt-<время>
+    для разбора (не больше max(backups, 1) копий). Возвращает None, если
+    файла нет, он пуст или ни одна копия не читается.
+    """
+    remove_stale_temp_files(filename)
+    candidates = [filename] + [_backup_name(filename, number) for number in range(1, backups + 1)]
+    for candidate in candidates:
+        try:
+            if candidate == filename and _is_blank(candidate):
+                # Пустой файл — пустой набор данных, а не повреждение
+                return None
+            with open(candidate, 'r', encoding='utf-8') as file:
+                data = load(file)
+        except FileNotFoundError:
+            if candidate == filename:
+                # Без основного файла резервные копии не используются:
+                # это новый (или намеренно удаленный) набор данных
+                return None
+            continue
+        except errors + (UnicodeDecodeError,) as e:
+            print(f"Файл {candidate} поврежден: {e}")
+            if candidate == filename:
+                _keep_corrupt_copy(filename, max(backups, 1))
+            continue
+        if candidate != filename:
+            print(f"Данные {filename} восстановлены из резервной копии {candidate}")
+        return data
+    return None
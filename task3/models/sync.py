@@ -0,0 +1,146 @@
+"""Сравнение и синхронизация наборов преподавателей между хранилищами."""
+from typing import Iterator, List, NamedTuple
+from .teacher import Teacher
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+SYNC_KEYS = ('teacher_id', 'snils')
+DEFAULT_BATCH_SIZE = 1000
+
+
+class Change(NamedTuple):
+    """Отличие между источником и приемником для одного ключа."""
+    kind: str
+    source: Teacher | None
+    target: Teacher | None
+
+
+class Rejected(NamedTuple):
+    """Преподаватель источника, которого не удалось вставить, и причина."""
+    teacher: Teacher
+    reason: str
+
+
+class SyncReport(NamedTuple):
+    """Итог синхронизации."""
+    inserted: int
+    updated: int
+    deleted: int
+    rejected: List[Rejected]
+
+
+def _content(teacher: Teacher, key: str) -> tuple:
+    """Возвращает сравниваемые поля преподавателя без ключевого поля."""
+    fields = teacher.snapshot().fields()
+    # При ключе snils ID не сравнивается: в приемнике он может быть другим
+    return fields[1:] if key == 'snils' else fields
+
+
+def diff(source, target, key: str = 'teacher_id') -> Iterator[Change]:
+    """Вычисляет отличия target от source слиянием двух упорядоченных потоков.
+
+    Оба репозитория читаются через iter_sorted(key), поэтому в памяти
+    находится по одному преподавателю с каждой стороны. При ключе
+    teacher_id смена СНИЛС (который нельзя обновить) выдается как
+    удаление и вставка.
+    """
+    if key not in SYNC_KEYS:
+        raise ValueError(f"Недопустимый ключ синхронизации: {key}")
+
+    sources = source.iter_sorted(key)
+    targets = target.iter_sorted(key)
+    src = next(sources, None)
+    dst = next(targets, None)
+
+    while src is not None or dst is not None:
+        src_key = getattr(src, key) if src is not None else None
+        dst_key = getattr(dst, key) if dst is not None else None
+
+        if dst is None or (src is not None and src_key < dst_key):
+            yield Change(INSERT, src, None)
+            src = next(sources, None)
+        elif src is None or dst_key < src_key:
+            yield Change(DELETE, None, dst)
+            dst = next(targets, None)
+        else:
+            if _content(src, key) != _content(dst, key):
+                if src.snils_value != dst.snils_value:
+                    yield Change(DELETE, None, dst)
+                    yield Change(INSERT, src, None)
+                else:
+                    yield Change(UPDATE, src, dst)
+            src = next(sources, None)
+            dst = next(targets, None)
+
+
+def _teacher_data(teacher: Teacher) -> dict:
+    """Возвращает данные преподавателя в формате update_teacher и update_many."""
+    return {
+        'last_name': teacher.last_name,
+        'first_name': teacher.first_name,
+        'patronymic': teacher.patronymic,
+        'academic_degree': teacher.academic_degree,
+        'administrative_position': teacher.administrative_position,
+        'experience_years': teacher.experience_years,
+        'snils': teacher.snils
+    }
+
+
+def sync(source, target, key: str = 'teacher_id',
+         batch_size: int = DEFAULT_BATCH_SIZE) -> SyncReport:
+    """Применяет к target только отличия от source в одной транзакции.
+
+    Вставки, обновления и удаления накапливаются пакетами по batch_size и
+    выполняются через add_teachers, update_many и delete_many; при сбросе
+    пакета удаления идут первыми, чтобы освободить ID и СНИЛС для вставок. Вставки сохраняют
+    ID источника; при ключе snils вставка, чей ID в приемнике занят другим
+    СНИЛС, получает новый ID приемника, иначе повторные запуски никогда не
+    сошлись бы. Вставки, которые все равно конфликтуют с приемником,
+    возвращаются в rejected с причиной.
+    """
+    inserts: List[Teacher] = []
+    deletes: List[int] = []
+    updates: List[tuple[int, dict]] = []
+    rejected: List[Rejected] = []
+    counts = {INSERT: 0, UPDATE: 0, DELETE: 0}
+
+    def flush():
+        if deletes:
+            counts[DELETE] += target.delete_many(deletes)
+            deletes.clear()
+        if inserts:
+            failed = target.add_teachers(inserts)
+            counts[INSERT] += len(inserts) - len(failed)
+            for teacher in failed:
+                if key == 'snils':
+                    # ID источника занят в приемнике: приемник назначает свой
+                    try:
+                        target.add_teacher(_teacher_data(teacher))
+                        counts[INSERT] += 1
+                        continue
+                    except ValueError as e:
+                        reason = str(e)
+                else:
+                    reason = (f"ID {teacher.teacher_id} или СНИЛС {teacher.snils} "
+                              f"уже заняты в приемнике")
+                rejected.append(Rejected(teacher, reason))
+            inserts.clear()
+        if updates:
+            counts[UPDATE] += target.update_many(updates)
+            updates.clear()
+
+    with target.transaction():
+        for change in diff(source, target, key):
+            if change.kind == INSERT:
+                inserts.append(change.source)
+            elif change.kind == DELETE:
+                deletes.append(change.target.teacher_id)
+            else:
+                updates.append((change.target.teacher_id, _teacher_data(change.source)))
+            if len(inserts) + len(deletes) + len(updates) >= batch_size:
+                flush()
+        flush()
+
+    return SyncReport(counts[INSERT], counts[UPDATE], counts[DELETE], rejected)
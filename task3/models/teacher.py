@@ -1,6 +1,12 @@
 import json
 import re
-from xml.etree import ElementTree as ET
+from typing import NamedTuple
+from .snils import Snils
+from .metrics import REGISTRY
+
+# Создание Teacher слишком быстрое для замера времени, поэтому только считается
+TEACHERS_CREATED = REGISTRY.counter('teachers_teacher_objects_created_total',
+                                    "Число созданных объектов Teacher").labels()
 
 
 class Employee:
@@ -9,7 +15,7 @@ class Employee:
         self._last_name = self.validate_name(last_name, "Last name")
         self._first_name = self.validate_name(first_name, "First name")
         self._experience_years = self.validate_experience_years(experience_years)
-        self._snils = self.validate_snils(snils)
+        self._snils = Snils.parse(snils)
 
     @staticmethod
     def validate_employee_id(employee_id: int) -> int:
@@ -52,51 +58,12 @@ class Employee:
 
     @staticmethod
     def validate_snils(snils: str) -> str:
-        if snils is None:
-            raise ValueError("SNILS cannot be None")
-
-        if not isinstance(snils, str):
-            raise ValueError("SNILS must be a string")
-
-        snils_clean = snils.strip()
-
-        pattern1 = r'^\d{11}$'  # Формат "12345678964"
-        pattern2 = r'^\d{3}-\d{3}-\d{3} \d{2}$'  # Формат "123-456-789 64"
-
-        if not (re.match(pattern1, snils_clean) or re.match(pattern2, snils_clean)):
-            raise ValueError("SNILS must be in format '12345678964' or '123-456-789 64'")
-
-        digits_only = re.sub(r'\D', '', snils_clean)
-
-        if len(digits_only) != 11:
-            raise ValueError("SNILS must contain exactly 11 digits")
-
-        Employee._validate_snils_checksum(digits_only)
-
-        return digits_only
+        return Snils.parse(snils).digits
 
     @staticmethod
     def _validate_snils_checksum(snils_digits: str) -> None:
         """Проверка контрольной суммы СНИЛС"""
-
-        base_number = snils_digits[:9]
-        check_number = int(snils_digits[9:])
-
-
-        if int(base_number) < 1001998:
-            return
-
-        total = 0
-        for i, digit in enumerate(base_number):
-            weight = 9 - i
-            total += int(digit) * weight
-
-        control_sum = total % 101
-        if control_sum == 100:
-            control_sum = 0
-
-        if control_sum != check_number:
-            raise ValueError("Invalid SNILS checksum")
+        Snils.validate_checksum(snils_digits)
 
     @property
     def employee_id(self) -> int:
@@ -116,6 +83,10 @@ class Employee:
 
     @property
     def snils(self) -> str:
+        return self._snils.digits
+
+    @property
+    def snils_value(self) -> Snils:
         return self._snils
 
     @employee_id.setter
@@ -135,10 +106,14 @@ class Employee:
         self._experience_years = self.validate_experience_years(value)
 
     def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Teacher):
+        if not isinstance(other, (Employee, TeacherSnapshot)):
             return False
 
-        return self._snils == other._snils
+        return self.snils_value == other.snils_value
+
+    def __hash__(self) -> int:
+        # СНИЛС не меняется после создания, поэтому хэш стабилен
+        return hash(self._snils)
 
 
 class Teacher(Employee):
@@ -174,10 +149,14 @@ class Teacher(Employee):
         self._academic_degree = Teacher.validate_optional_string(params.get('academic_degree'), "academic_degree")
         self._administrative_position = Teacher.validate_optional_string(params.get('administrative_position'),
                                                                          "administrative_degree")
+        TEACHERS_CREATED.inc()
 
     @staticmethod
     def _parse_string(data_string):
-        parts = data_string.split(';')
+        return Teacher._params_from_parts(data_string.split(';'))
+
+    @staticmethod
+    def _params_from_parts(parts):
         if len(parts) != 8:
             raise ValueError(
                 "String format must be: id;last_name;first_name;patronymic;degree;position;experience;snils")
@@ -206,6 +185,10 @@ class Teacher(Employee):
         except json.JSONDecodeError:
             raise ValueError("Invalid JSON format")
 
+        return Teacher._params_from_dict(data)
+
+    @staticmethod
+    def _params_from_dict(data):
         if not isinstance(data, dict):
             raise ValueError("JSON must be an object")
 
@@ -227,11 +210,20 @@ class Teacher(Employee):
 
     @staticmethod
     def _parse_xml(xml_string):
+        from xml.etree import ElementTree as ET
         try:
             root = ET.fromstring(xml_string)
         except ET.ParseError:
             raise ValueError("Invalid XML format")
 
+        return Teacher._params_from_element(root)
+
+    @staticmethod
+    def _params_from_element(root):
+        return Teacher._params_from_xml_fields(Teacher._xml_fields(root))
+
+    @staticmethod
+    def _xml_fields(root):
         if root.tag != 'teacher':
             raise ValueError("XML root element must be 'teacher'")
 
@@ -249,6 +241,10 @@ class Teacher(Employee):
             if element is not None and element.text is not None:
                 data[field] = element.text
 
+        return data
+
+    @staticmethod
+    def _params_from_xml_fields(data):
         try:
             teacher_id = int(data['teacher_id'])
             experience_years = int(data.get('experience_years', 0))
@@ -315,6 +311,11 @@ class Teacher(Employee):
     def administrative_position(self, value: str | None):
         self._administrative_position = Teacher.validate_optional_string(value, "administrative_position")
 
+    def snapshot(self) -> 'TeacherSnapshot':
+        return TeacherSnapshot(self._employee_id, self._last_name, self._first_name, self._patronymic,
+                               self._academic_degree, self._administrative_position,
+                               self._experience_years, self._snils)
+
     def get_full_name(self) -> str:
         if self._patronymic:
             return f"{self._last_name} {self._first_name} {self._patronymic}"
@@ -354,3 +355,37 @@ class Teacher(Employee):
                 f"administrative_position='{self._administrative_position}', "
                 f"experience_years={self._experience_years}, snils='{self._snils}')")
 
+
+class TeacherSnapshot(NamedTuple):
+    """Неизменяемый снимок данных преподавателя.
+
+    Равенство и хэш, как и у Teacher, определяются СНИЛС, поэтому снимок
+    и преподаватель взаимозаменяемы в множествах и ключах словарей.
+    Для сравнения содержимого используйте fields().
+    """
+    teacher_id: int
+    last_name: str
+    first_name: str
+    patronymic: str | None
+    academic_degree: str | None
+    administrative_position: str | None
+    experience_years: int
+    snils_value: Snils
+
+    @property
+    def snils(self) -> str:
+        return self.snils_value.digits
+
+    def fields(self) -> tuple:
+        return tuple(self)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (Employee, TeacherSnapshot)):
+            return False
+        return self.snils_value == other.snils_value
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    def __hash__(self) -> int:
+        return hash(self.snils_value)
@@ -0,0 +1,47 @@
+"""Синхронизация преподавателей между хранилищами (json, yaml, db).
+
+Пример:
+    python sync_teachers.py json db --key snils
+"""
+import argparse
+import sys
+from collections import Counter
+
+import config
+from controllers.create_repo import CreateRepoFactory
+from models.sync import SYNC_KEYS, diff, sync
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Синхронизация преподавателей между хранилищами")
+    parser.add_argument('source', choices=config.REPO_TYPES)
+    parser.add_argument('target', choices=config.REPO_TYPES)
+    parser.add_argument('--key', choices=SYNC_KEYS, default='teacher_id')
+    parser.add_argument('--batch-size', type=int, default=config.SYNC_BATCH_SIZE)
+    parser.add_argument('--dry-run', action='store_true',
+                        help="только показать количество отличий")
+    args = parser.parse_args(argv)
+
+    if args.source == args.target:
+        parser.error("источник и приемник должны различаться")
+
+    source = CreateRepoFactory.create_repo(args.source)
+    target = CreateRepoFactory.create_repo(args.target)
+
+    if args.dry_run:
+        counts = Counter(change.kind for change in diff(source, target, args.key))
+        print(f"Вставок: {counts['insert']}, обновлений: {counts['update']}, "
+              f"удалений: {counts['delete']}")
+        return
+
+    report = sync(source, target, args.key, args.batch_size)
+    for teacher, reason in report.rejected:
+        print(f"Не удалось вставить {teacher}: {reason}", file=sys.stderr)
+    print(f"Вставлено: {report.inserted}, обновлено: {report.updated}, "
+          f"удалено: {report.deleted}, отклонено: {len(report.rejected)}")
+    if report.rejected:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""Ограниченный кэш с вытеснением давно не использованных записей."""
+from collections import OrderedDict
+import threading
+
+
+class LruCache:
+    """Потокобезопасный LRU-кэш на maxsize записей."""
+
+    def __init__(self, maxsize: int):
+        """Создает кэш; при maxsize <= 0 записи не сохраняются."""
+        self._maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """Возвращает значение по ключу и отмечает его как недавно использованное."""
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def put(self, key, value):
+        """Сохраняет значение, вытесняя самую старую запись при переполнении."""
+        if self._maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self._maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        """Очищает кэш."""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,18 +1,185 @@
-from flask import render_template, request, redirect, url_for
+from datetime import datetime, timezone
+import gzip
+import hashlib
+import json
+import os
+import time
+from flask import render_template, request, redirect, url_for, jsonify, make_response, session, current_app
+from markupsafe import Markup
 from controllers.subject import Observer
+from views.cache import LruCache
+from models.repositories import TEACHER_FIELDS, row_type
+from models.metrics import timed
+from models import profiling
+
+try:
+    import brotli
+except ImportError:
+    # Сжатие br доступно только при установленном пакете brotli
+    brotli = None
+
+# Отличает ETag разных запусков приложения: поколения репозиториев
+# уникальны только в пределах процесса
+_BOOT_ID = f"{os.getpid():x}-{time.time_ns():x}"
+
+
+def _etag(key: tuple) -> str:
+    return hashlib.sha1(repr((_BOOT_ID,) + key).encode('utf-8')).hexdigest()
 
 
 class TeacherListView(Observer):
-    def __init__(self):
+    """Список преподавателей с кэшем страниц и строк таблицы.
+
+    Страница кэшируется по поколению репозитория, выбранному хранилищу и
+    параметрам запроса, строка таблицы — по содержимому преподавателя,
+    поэтому после записи заново отрисовываются только измененные строки.
+    Представление общее для всех запросов, поэтому render() получает данные
+    своего запроса аргументом, а не из последнего уведомления.
+    """
+
+    def __init__(self, page_cache_size: int = 64, row_cache_size: int = 10000):
         self.teachers = []
+        self.generation = None
+        self.last_modified = None
+        self._pages = LruCache(page_cache_size)
+        self._rows = LruCache(row_cache_size)
+
+    def update(self, data):
+        self.teachers = data['teachers']
+        self.generation = data['generation']
+        self.last_modified = data['last_modified']
+
+    def cache_stats(self) -> dict:
+        """Возвращает попадания и промахи кэшей страниц и строк."""
+        return {
+            'page': (self._pages.hits, self._pages.misses),
+            'row': (self._rows.hits, self._rows.misses)
+        }
+
+    @staticmethod
+    def _page_key(generation: int) -> tuple:
+        """Ключ страницы с параметрами запроса в нормализованном порядке."""
+        args = tuple(sorted(request.args.items(multi=True)))
+        return generation, session.get('repo_type'), args
+
+    @staticmethod
+    def _response(body: str, etag: str, last_modified: float):
+        """Ответ с валидаторами; при совпадении с запросом клиента — 304."""
+        response = make_response(body)
+        response.set_etag(etag)
+        response.last_modified = datetime.fromtimestamp(last_modified, timezone.utc)
+        response.cache_control.no_cache = True
+        response.vary.add('Cookie')
+        return response.make_conditional(request)
+
+    def cached_response(self, generation: int, last_modified: float):
+        """Возвращает ответ без обращения к данным или None, если страницы нет в кэше."""
+        key = self._page_key(generation)
+        etag = _etag(key)
+        if request.if_none_match.contains(etag):
+            return self._response('', etag, last_modified)
+        body = self._pages.get(key)
+        if body is None:
+            return None
+        return self._response(body, etag, last_modified)
+
+    def _render_row(self, teacher) -> Markup:
+        """Отрисовывает строку таблицы, используя кэш по версии преподавателя."""
+        version = tuple(teacher)
+        row = self._rows.get(version)
+        if row is None:
+            # Шаблон строки отрисовывается напрямую, без контекста запроса
+            template = current_app.jinja_env.get_template('_teacher_row.html')
+            row = Markup(template.render(teacher=teacher))
+            self._rows.put(version, row)
+        return row
+
+    @timed('view', 'TeacherListView.render')
+    def render(self, data: dict):
+        """Отрисовывает страницу по данным, загруженным для текущего запроса."""
+        teachers = data['teachers']
+        key = self._page_key(data['generation'])
+        with profiling.stage('render'):
+            body = render_template('index.html',
+                                   teachers=teachers,
+                                   rows=[self._render_row(teacher) for teacher in teachers],
+                                   request_args=request.args)
+        self._pages.put(key, body)
+        return self._response(body, _etag(key), data['last_modified'])
+
+
+class StatsView(Observer):
+    def __init__(self):
+        self.stats = {}
 
-    def update(self, teachers):
-        self.teachers = teachers
+    def update(self, stats):
+        self.stats = stats
 
+    @timed('view', 'StatsView.render')
     def render(self):
-        return render_template('index.html',
-                               teachers=self.teachers,
-                               request_args=request.args)
+        return jsonify(self.stats)
+
+
+# Ответы меньше этого размера (в байтах) не сжимаются
+API_COMPRESS_MIN_SIZE = 1024
+
+
+def api_fields(value: str | None) -> tuple:
+    """Разбирает параметр fields=last_name,snils в кортеж полей."""
+    if not value:
+        return TEACHER_FIELDS
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(',') if name.strip()))
+    row_type(fields)  # проверяет имена полей
+    return fields
+
+
+def json_response(payload, status: int = 200):
+    """Компактный JSON-ответ со сжатием gzip/br по Accept-Encoding."""
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    response = make_response(body, status)
+    response.mimetype = 'application/json'
+    response.vary.add('Accept-Encoding')
+    if len(body) < API_COMPRESS_MIN_SIZE:
+        return response
+
+    encoding = request.accept_encodings.best_match(['br', 'gzip'] if brotli else ['gzip'])
+    if encoding == 'br':
+        response.set_data(brotli.compress(body, quality=4))
+    elif encoding == 'gzip':
+        response.set_data(gzip.compress(body, compresslevel=6))
+    else:
+        return response
+    response.content_encoding = encoding
+    return response
+
+
+class TeacherApiView(Observer):
+    """JSON-представление строк преподавателей с выбранными полями"""
+
+    def __init__(self):
+        self.data = {}
+
+    def update(self, data):
+        self.data = data
+
+    @timed('view', 'TeacherApiView.render_list')
+    def render_list(self):
+        fields = self.data["fields"]
+        with profiling.stage('render'):
+            return json_response({
+                "total": self.data["total"],
+                "page": self.data["page"],
+                "per_page": self.data["per_page"],
+                "teachers": [{name: getattr(row, name) for name in fields}
+                             for row in self.data["teachers"]]
+            })
+
+    @timed('view', 'TeacherApiView.render_teacher')
+    def render_teacher(self):
+        row = self.data.get("teacher")
+        if row is None:
+            return json_response({"error": "Преподаватель не найден"}, 404)
+        return json_response(row._asdict())
 
 
 class AddTeacherView(Observer):
@@ -24,6 +191,7 @@ class AddTeacherView(Observer):
         self.success = data.get("success", False)
         self.error = data.get("error")
 
+    @timed('view', 'AddTeacherView.render')
     def render(self):
         return render_template('add_teacher_form.html', error=self.error)
 
@@ -41,6 +209,7 @@ class UpdateTeacherView(Observer):
         self.teacher_id = data.get("teacher_id")
         self.error = data.get("error")
 
+    @timed('view', 'UpdateTeacherView.render')
     def render(self):
         # Если нет teacher, но есть form_data, используем его
         form_data = self.teacher if isinstance(self.teacher, dict) else None